@@ -18,21 +18,109 @@
 # ##Основное задание
 
 # %% colab={"base_uri": "https://localhost:8080/"} id="awAFmET9dvH_" outputId="5ba28c71-1a9d-4af5-fcaa-16033b270c17"
+import sys
+
 import pandas as pd
+import numpy as np
 import networkx as nx
 # !pip install pulp
 import pulp
 
+# Ячейки с загрузкой csv, моделями и отчетами выполняются только при запуске файла
+# (скрипт или ноутбук). При импорте (тесты, процессы пула) и в режимах CLI
+# --portfolio/--benchmark (см. main) определяются только функции и константы.
+CLI_MODES = ('--portfolio', '--benchmark')
+RUN_NOTEBOOK = __name__ == '__main__' and not any(arg.split('=')[0] in CLI_MODES for arg in sys.argv[1:])
+
 # %% [markdown] id="uXVCGlzFepA1"
 # ### Загрузка датасетов
 #
 
+# %% id="dAtALoAd3rX1"
+# Схемы датасетов: обязательные колонки и компактные типы.
+# Колонки, которых нет в файле, пропускаются (например, в демо-данных).
+import hashlib
+import os
+
+DATA_CACHE_DIR = '.data_cache'
+
+DATA_SCHEMAS = {
+    'csv1.txt': {
+        'required': ['task_id', 'task_name', 'optimistic_days', 'likely_days', 'pessimistic_days'],
+        'unique': 'task_id',
+        'dtypes': {
+            'skill_1': 'category', 'skill_2': 'category',
+            'client_visibility': 'category', 'is_innovation': 'category',
+            'min_security': 'int8',
+        },
+    },
+    'csv3.txt': {
+        'required': ['emp_id', 'emp_name', 'primary_skill', 'skill_level', 'hourly_rate', 'max_hours_day'],
+        'unique': 'emp_id',
+        'dtypes': {
+            'primary_skill': 'category', 'secondary_skill': 'category',
+            'location': 'category', 'health_status': 'category', 'innovation_interest': 'category',
+            'skill_level': 'int8', 'sec_skill_level': 'int8', 'security_clear': 'int8',
+            'experience': 'int8', 'max_hours_day': 'int8', 'workload_pct': 'int8',
+        },
+    },
+    'csv4.txt': {
+        'required': ['constraint_type', 'constraint_value'],
+        'dtypes': {'constraint_type': 'category'},
+    },
+}
+
+def apply_schema(df, schema, name):
+    """Проверяет датасет по схеме и приводит колонки к компактным типам"""
+    missing = [column for column in schema.get('required', []) if column not in df.columns]
+    if missing:
+        raise ValueError(f"{name}: нет обязательных колонок {missing}")
+
+    unique_column = schema.get('unique')
+    if unique_column and df[unique_column].duplicated().any():
+        duplicates = df.loc[df[unique_column].duplicated(), unique_column].tolist()
+        raise ValueError(f"{name}: повторяющиеся значения {unique_column}: {duplicates}")
+
+    if {'optimistic_days', 'likely_days', 'pessimistic_days'} <= set(df.columns):
+        bad_pert = df[(df['optimistic_days'] > df['likely_days']) | (df['likely_days'] > df['pessimistic_days'])]
+        if not bad_pert.empty:
+            raise ValueError(f"{name}: нарушен порядок PERT-оценок в строках {bad_pert.index.tolist()}")
+
+    for column, dtype in schema.get('dtypes', {}).items():
+        if column not in df.columns:
+            continue
+        if dtype != 'category' and df[column].isna().any():
+            raise ValueError(f"{name}: пропуски в целочисленной колонке {column}")
+        df[column] = df[column].astype(dtype)
+    return df
+
+def load_dataset(path, cache_dir=DATA_CACHE_DIR):
+    """Загружает csv с проверкой схемы; повторные загрузки читаются из бинарного кэша по хэшу файла"""
+    name = os.path.basename(path)
+    with open(path, 'rb') as f:
+        digest = hashlib.sha256(f.read()).hexdigest()[:16]
+
+    cache_path = os.path.join(cache_dir, f"{name}.{digest}.pkl")
+    if os.path.exists(cache_path):
+        return pd.read_pickle(cache_path)
+
+    df = apply_schema(pd.read_csv(path), DATA_SCHEMAS.get(name, {}), name)
+
+    # Кэш хранит только последнюю версию каждого файла
+    os.makedirs(cache_dir, exist_ok=True)
+    for old_file in os.listdir(cache_dir):
+        if old_file.startswith(f"{name}.") and old_file.endswith('.pkl'):
+            os.remove(os.path.join(cache_dir, old_file))
+    df.to_pickle(cache_path)
+    return df
+
 # %% id="K-YoUbnfd23J"
-df_project = pd.read_csv('csv1.txt') #Блок метаданных проекта
-df_tasks = pd.read_csv('csv2.txt') #Блок описания задач (20 задач)
-df_employees= pd.read_csv('csv3.txt') #Блок описания ресурсов (30 сотрудников)
-df_limitations = pd.read_csv('csv4.txt') #Блок дополнительных ограничений
-df_keys= pd.read_csv('csv5.txt') #Ключевые связи
+if RUN_NOTEBOOK:
+    df_project = load_dataset('csv1.txt') #Блок метаданных проекта
+    df_tasks = load_dataset('csv2.txt') #Блок описания задач (20 задач)
+    df_employees= load_dataset('csv3.txt') #Блок описания ресурсов (30 сотрудников)
+    df_limitations = load_dataset('csv4.txt') #Блок дополнительных ограничений
+    df_keys= load_dataset('csv5.txt') #Ключевые связи
 
 # %% [markdown] id="szdnNRHEg16L"
 # ### 1. Подготовка данных
@@ -41,59 +129,214 @@ df_keys= pd.read_csv('csv5.txt') #Ключевые связи
 #Расчет длительности (pert)
 #PERT = (Оптимистичная + 4 × Наиболее вероятная + Пессимистичная) / 6
 
-df_project['pert_expected_duration'] = (
-    df_project['optimistic_days'] +
-    4 * df_project['likely_days'] +
-    df_project['pessimistic_days']
-) / 6
+if RUN_NOTEBOOK:
+    df_project['pert_expected_duration'] = (
+        df_project['optimistic_days'] +
+        4 * df_project['likely_days'] +
+        df_project['pessimistic_days']
+    ) / 6
 
-df_project['pert_expected_duration'] = df_project['pert_expected_duration'].round(2)
+    df_project['pert_expected_duration'] = df_project['pert_expected_duration'].round(2)
 
 
 # %% id="0OvMVZAuiwPf"
 # Расчет общих трудозатрат
-df_project['total_effort_hours'] = df_project['pert_expected_duration'] * 8
+if RUN_NOTEBOOK:
+    df_project['total_effort_hours'] = df_project['pert_expected_duration'] * 8
 
 # %% id="m4QWT7ZNHW4h"
 # Корректировка максимальной загрузки для сотрудников с health_status != "Отлично"
-df_employees.loc[df_employees['health_status'] != 'Отлично', 'max_hours_day'] -= 2
+if RUN_NOTEBOOK:
+    df_employees.loc[df_employees['health_status'] != 'Отлично', 'max_hours_day'] -= 2
+
+# %% id="Vq3CalNd8xKe"
+# Календарь доступности: рабочие дни проекта (без выходных и праздников) и часы каждого
+# сотрудника по рабочим дням с учетом отпусков. Строится один раз; доступные часы
+# за любой диапазон дней - разность префиксных сумм, O(1) на запрос.
+PROJECT_START_DATE = '2024-01-09'
+HOLIDAYS = [
+    '2024-01-01', '2024-01-02', '2024-01-03', '2024-01-04', '2024-01-05', '2024-01-08',
+    '2024-02-23', '2024-03-08', '2024-04-29', '2024-04-30', '2024-05-01', '2024-05-09',
+    '2024-05-10', '2024-06-12', '2024-11-04', '2024-12-30', '2024-12-31',
+]
+
+def parse_vacation_dates(value):
+    """Парсит отпуска вида '2024-02-05:2024-02-09;2024-03-11' в список (начало, конец)"""
+    if not isinstance(value, str) or not value.strip():
+        return []
+    ranges = []
+    for part in value.replace(';', ',').split(','):
+        start, _, end = part.strip().partition(':')
+        if start:
+            ranges.append((pd.Timestamp(start), pd.Timestamp(end or start)))
+    return ranges
+
+def build_capacity_calendar(employees_df, start_date=PROJECT_START_DATE, n_calendar_days=365, holidays=HOLIDAYS):
+    """Календарь: рабочие даты и матрица часов сотрудник x рабочий день (отпуск - 0 часов)"""
+    start_date = pd.Timestamp(start_date)
+    dates = pd.bdate_range(start_date, start_date + pd.Timedelta(days=n_calendar_days - 1),
+                           freq='C', holidays=list(holidays))
+    n_employees = len(employees_df)
+    max_hours = employees_df['max_hours_day'] if 'max_hours_day' in employees_df else pd.Series(8, index=employees_df.index)
+    workload = employees_df['workload_pct'] if 'workload_pct' in employees_df else pd.Series(0, index=employees_df.index)
+    nominal_hours = (max_hours.to_numpy(dtype=float) * (1 - workload.to_numpy(dtype=float) / 100)).clip(min=0)
+
+    daily_hours = np.repeat(nominal_hours[:, None], len(dates), axis=1)
+    if 'vacation_dates' in employees_df:
+        for row, value in enumerate(employees_df['vacation_dates']):
+            for vacation_start, vacation_end in parse_vacation_dates(value):
+                daily_hours[row, dates.searchsorted(vacation_start):dates.searchsorted(vacation_end, side='right')] = 0
+
+    prefix_hours = np.zeros((n_employees, len(dates) + 1))
+    np.cumsum(daily_hours, axis=1, out=prefix_hours[:, 1:])
+    return {
+        'start_date': start_date,
+        'holidays': list(holidays),
+        'dates': dates,
+        'emp_index': pd.Series(np.arange(n_employees), index=employees_df['emp_id'].to_numpy()),
+        'nominal_hours': nominal_hours,
+        'daily_hours': daily_hours,
+        'prefix_hours': prefix_hours,
+    }
+
+def update_capacity_calendar(calendar, employees_df):
+    """Календарь, в котором строки сотрудников employees_df пересчитаны (новые - добавлены)"""
+    n_calendar_days = (calendar['dates'][-1] - calendar['start_date']).days + 1 if len(calendar['dates']) else 0
+    changed = build_capacity_calendar(employees_df, calendar['start_date'], n_calendar_days, calendar['holidays'])
+    keep = ~calendar['emp_index'].index.isin(employees_df['emp_id'])
+    emp_ids = np.concatenate([calendar['emp_index'].index[keep], employees_df['emp_id'].to_numpy()])
+    daily_hours = np.vstack([calendar['daily_hours'][calendar['emp_index'].to_numpy()[keep]], changed['daily_hours']])
+    prefix_hours = np.zeros((len(emp_ids), daily_hours.shape[1] + 1))
+    np.cumsum(daily_hours, axis=1, out=prefix_hours[:, 1:])
+    return dict(
+        calendar,
+        emp_index=pd.Series(np.arange(len(emp_ids)), index=emp_ids),
+        nominal_hours=np.concatenate([calendar['nominal_hours'][calendar['emp_index'].to_numpy()[keep]],
+                                      changed['nominal_hours']]),
+        daily_hours=daily_hours,
+        prefix_hours=prefix_hours,
+    )
+
+def working_day_dates(calendar, days):
+    """Даты рабочих дней по их номерам (за пределами календаря - тот же график дальше)"""
+    days = np.asarray(days, dtype=np.int64)
+    dates = calendar['dates']
+    if days.size and days.max() >= len(dates):
+        dates = pd.bdate_range(calendar['start_date'], periods=int(days.max()) + 1, freq='C',
+                               holidays=calendar['holidays'])
+    return dates[days]
+
+def calendar_day_index(calendar, days_from_start):
+    """Число рабочих дней календаря до даты start_date + days_from_start (календарных дней)"""
+    return calendar['dates'].searchsorted(calendar['start_date'] + pd.to_timedelta(days_from_start, unit='D'))
+
+def calculate_availability_with_vacation(calendar, emp_ids, start_day=0, end_day=None):
+    """Доступные часы сотрудников в рабочих днях [start_day, end_day) календаря"""
+    n_days = len(calendar['dates'])
+    rows = calendar['emp_index'].loc[np.atleast_1d(emp_ids)].to_numpy()
+    start_day = np.clip(start_day, 0, n_days)
+    end_day = np.clip(n_days if end_day is None else end_day, 0, n_days)
+    hours = calendar['prefix_hours'][rows, end_day] - calendar['prefix_hours'][rows, start_day]
+    return hours if np.ndim(emp_ids) else float(hours[0])
+
+if RUN_NOTEBOOK:
+    capacity_calendar = build_capacity_calendar(df_employees, n_calendar_days=2 * int(df_tasks['total_expected_duration'].iloc[0]))
 
 
 # %% [markdown] id="nGop4mPmM3zi"
 # ###2. Функции для проверки ограничений
 
 # %% id="GXjW7g5gN17n"
-# Функция для проверки подходящих сотрудников для задачи
-def get_eligible_employees_for_task(task, employees_df):
-    """Находит сотрудников, подходящих для задачи по всем критериям"""
-    eligible_employees = []
-
-    for _, emp in employees_df.iterrows():
-        # 1. Проверка навыков (skill_1 и skill_2 с уровнем >= 7)
-        skill_1_ok = (
-            (emp['primary_skill'] == task['skill_1'] and emp['skill_level'] >= 7) or
-            (emp['secondary_skill'] == task['skill_1'] and emp['sec_skill_level'] >= 7)
-        )
-
-        skill_2_ok = (
-            (emp['primary_skill'] == task['skill_2'] and emp['skill_level'] >= 7) or
-            (emp['secondary_skill'] == task['skill_2'] and emp['sec_skill_level'] >= 7)
-        )
-
-        skill_ok = skill_1_ok or skill_2_ok
-
-        # 2. Проверка security clearance
-        security_ok = emp['security_clear'] >= task['min_security']
-
-        # 3. Проверка опыта для задач с высокой видимостью
-        experience_ok = True
-        if task['client_visibility'] == 'Высокая':
-            experience_ok = emp['experience'] >= 3
+# Правила опыта для задач с высокой видимостью.
+# Принимают массивы experience (1 x сотрудники) и high_visibility (задачи x 1)
+# и возвращают булеву матрицу задачи x сотрудники.
+def default_experience_rule(experience, high_visibility):
+    """Стандартное правило: опыт >= 3 лет для задач с высокой видимостью"""
+    return ~high_visibility | (experience >= 3)
+
+
+def build_eligibility_matrix(tasks_df, employees_df, experience_rule=default_experience_rule, min_skill_level=7):
+    """Строит булеву матрицу допустимости задача x сотрудник за один проход (broadcasting)"""
+    # Кодируем навыки задач и сотрудников в общий целочисленный словарь
+    skill_columns = [tasks_df['skill_1'], tasks_df['skill_2'],
+                     employees_df['primary_skill'], employees_df['secondary_skill']]
+    codes, _ = pd.factorize(pd.concat(skill_columns, ignore_index=True))
+    n_tasks, n_emps = len(tasks_df), len(employees_df)
+    task_skill_1 = codes[:n_tasks]
+    task_skill_2 = codes[n_tasks:2 * n_tasks]
+    emp_primary = codes[2 * n_tasks:2 * n_tasks + n_emps]
+    emp_secondary = codes[2 * n_tasks + n_emps:]
+
+    # Навык сотрудника учитывается только при уровне >= min_skill_level (NaN не совпадает ни с чем)
+    emp_primary = np.where(employees_df['skill_level'].to_numpy() >= min_skill_level, emp_primary, -1)
+    emp_secondary = np.where(employees_df['sec_skill_level'].to_numpy() >= min_skill_level, emp_secondary, -1)
+    emp_primary, emp_secondary = emp_primary[None, :], emp_secondary[None, :]
+
+    skill_ok = np.zeros((n_tasks, n_emps), dtype=bool)
+    for task_skill in (task_skill_1, task_skill_2):
+        task_skill = np.where(task_skill >= 0, task_skill, -2)[:, None]
+        skill_ok |= (emp_primary == task_skill) | (emp_secondary == task_skill)
+
+    # Проверка security clearance
+    security_ok = (
+        employees_df['security_clear'].to_numpy(dtype=float)[None, :] >=
+        tasks_df['min_security'].to_numpy(dtype=float)[:, None]
+    )
+
+    # Проверка опыта для задач с высокой видимостью
+    high_visibility = (tasks_df['client_visibility'] == 'Высокая').to_numpy()[:, None]
+    experience = employees_df['experience'].to_numpy(dtype=float)[None, :]
+    experience_ok = experience_rule(experience, high_visibility)
+
+    return pd.DataFrame(
+        skill_ok & security_ok & experience_ok,
+        index=tasks_df['task_id'].to_numpy(),
+        columns=employees_df['emp_id'].to_numpy()
+    )
+
+
+def eligible_pairs(eligibility):
+    """Возвращает список пар (task_id, emp_id) из матрицы допустимости"""
+    task_idx, emp_idx = np.nonzero(eligibility.to_numpy())
+    return list(zip(eligibility.index[task_idx], eligibility.columns[emp_idx]))
+
+
+def build_cost_matrix(tasks_df, employees_df):
+    """Матрица стоимости задача x сотрудник: total_effort_hours_i * hourly_rate_j"""
+    hours = tasks_df['total_effort_hours'].to_numpy(dtype=float)
+    rates = employees_df['hourly_rate'].to_numpy(dtype=float)
+    return pd.DataFrame(
+        np.outer(hours, rates),
+        index=tasks_df['task_id'].to_numpy(),
+        columns=employees_df['emp_id'].to_numpy()
+    )
+
+
+def build_cost_expression(assignments, cost_matrix):
+    """Собирает целевую функцию одним LpAffineExpression по индексированной матрице стоимости"""
+    if not assignments:
+        return pulp.LpAffineExpression()
+    task_ids, emp_ids = zip(*assignments.keys())
+    task_pos = cost_matrix.index.get_indexer(task_ids)
+    emp_pos = cost_matrix.columns.get_indexer(emp_ids)
+    costs = cost_matrix.to_numpy()[task_pos, emp_pos].tolist()
+    return pulp.LpAffineExpression(zip(assignments.values(), costs))
+
+
+def build_assignment_index(assignments):
+    """Группирует переменные назначений по задачам и по сотрудникам за один проход"""
+    by_task, by_employee = {}, {}
+    for (task_id, emp_id), var in assignments.items():
+        by_task.setdefault(task_id, []).append(var)
+        by_employee.setdefault(emp_id, []).append((task_id, var))
+    return by_task, by_employee
 
-        if skill_ok and security_ok and experience_ok:
-            eligible_employees.append(emp['emp_id'])
 
-    return eligible_employees
+# Функция для проверки подходящих сотрудников для задачи
+def get_eligible_employees_for_task(task, employees_df, experience_rule=default_experience_rule):
+    """Находит сотрудников, подходящих для задачи по всем критериям"""
+    eligibility = build_eligibility_matrix(task.to_frame().T, employees_df, experience_rule)
+    return eligibility.columns[eligibility.iloc[0].to_numpy()].tolist()
 
 
 # %% id="3PMjWuFON9NS"
@@ -104,172 +347,600 @@ def get_innovation_preference(task, employees_df):
         return employees_df[employees_df['innovation_interest'] == 'Да']['emp_id'].tolist()
     return []  # Для неинновационных задач ограничения нет
 
+# Мягкие ограничения: веса предпочтений в баллах за одно назначение
+SOFT_CONSTRAINT_WEIGHTS = {'innovation': 3.0, 'health': 1.0, 'location': 1.0}
+PREFERRED_LOCATION = 'Москва'
+
+def build_preference_matrix(tasks_df, employees_df, weights=SOFT_CONSTRAINT_WEIGHTS,
+                            preferred_location=PREFERRED_LOCATION):
+    """Матрица предпочтений задача x сотрудник (чем больше, тем лучше назначение):
+    интерес к инновациям для инновационных задач, отличное здоровье, предпочтительная локация"""
+    innovation_task = (tasks_df['is_innovation'] == 'Да').to_numpy()[:, None]
+    innovation_emp = (employees_df['innovation_interest'] == 'Да').to_numpy()[None, :]
+    healthy = (employees_df['health_status'] == 'Отлично').to_numpy()[None, :]
+    local = (employees_df['location'] == preferred_location).to_numpy()[None, :]
+    score = (weights.get('innovation', 0) * (innovation_task & innovation_emp)
+             + weights.get('health', 0) * healthy
+             + weights.get('location', 0) * local)
+    return pd.DataFrame(
+        np.broadcast_to(score, (len(tasks_df), len(employees_df))).astype(float),
+        index=tasks_df['task_id'].to_numpy(),
+        columns=employees_df['emp_id'].to_numpy(),
+    )
+
 
 # %% id="7f5buXP_NDIp"
 # Функция для проверки локации
-def check_location_constraint(task_id, assigned_employees, employees_df, limitations_df):
+def index_co_location_tasks(limitations_df):
+    """Множество задач с требованием совместной локации (разбор affected_tasks один раз)"""
+    rows = limitations_df[(limitations_df['constraint_type'] == 'team_co_location') &
+                          (limitations_df['constraint_value'] == 'Да')]
+    return {
+        task_id.strip()
+        for affected in rows['affected_tasks'].dropna()
+        for task_id in str(affected).split(',') if task_id.strip()
+    }
+
+def check_location_constraint(task_id, assigned_employees, employees_df, limitations_df, co_location_tasks=None):
     """Проверяет требование совместной локации"""
-    # Ищем ограничение по локации для этой задачи
-    location_constraint = limitations_df[
-        (limitations_df['constraint_type'] == 'team_co_location') &
-        (limitations_df['affected_tasks'].str.contains(task_id, na=False))
-    ]
+    if co_location_tasks is None:
+        co_location_tasks = index_co_location_tasks(limitations_df)
 
-    if not location_constraint.empty and location_constraint.iloc[0]['constraint_value'] == 'Да':
-        if len(assigned_employees) > 0:
-            locations = employees_df[employees_df['emp_id'].isin(assigned_employees)]['location'].unique()
-            return len(locations) <= 1
+    if task_id in co_location_tasks and len(assigned_employees) > 0:
+        locations = employees_df[employees_df['emp_id'].isin(assigned_employees)]['location'].unique()
+        return len(locations) <= 1
     return True
 
+def add_co_location_constraints(model, assignments, employees_df, co_location_tasks):
+    """Совместная локация как ограничения модели: для задачи выбирается одна локация
+    (индикаторы loc_{task}_{k}), назначать можно только сотрудников из нее.
+    Сотрудников без локации на такие задачи не назначаем: совместность не проверить."""
+    emp_location = dict(zip(employees_df['emp_id'], employees_df['location']))
+    by_task = {}
+    for (task_id, emp_id), var in assignments.items():
+        if task_id not in co_location_tasks:
+            continue
+        if pd.isna(emp_location[emp_id]):
+            model += var == 0, f"co_location_unknown_{task_id}_{emp_id}"
+        else:
+            by_task.setdefault(task_id, []).append((emp_location[emp_id], var))
+
+    location_vars = {}
+    for task_id, located_vars in by_task.items():
+        locations = sorted({location for location, _ in located_vars})
+        if len(locations) < 2:
+            continue  # Все подходящие сотрудники и так в одной локации
+        task_locations = {
+            location: pulp.LpVariable(f"loc_{task_id}_{k}", cat='Binary')
+            for k, location in enumerate(locations)
+        }
+        model += pulp.lpSum(task_locations.values()) == 1, f"co_location_{task_id}"
+        for k, (location, var) in enumerate(located_vars):
+            model += var <= task_locations[location], f"co_location_{task_id}_{k}"
+        location_vars[task_id] = task_locations
+    return location_vars
+
 
 # %% [markdown] id="0TDKt-_GODbf"
 # ### 3. Постановка задачи линейного программирования
 
 # %% id="3KoXTVGwOb56"
 # Создаем модель оптимизации
-model = pulp.LpProblem("Optimal_Resource_Allocation", pulp.LpMinimize)
+if RUN_NOTEBOOK:
+    model = pulp.LpProblem("Optimal_Resource_Allocation", pulp.LpMinimize)
 
 # %% colab={"base_uri": "https://localhost:8080/"} id="lHtMeCQrOeqC" outputId="f7672b4f-f70a-4bde-a499-7474f92e6356"
 # Создаем переменные решения x_ij (задача i -> сотрудник j)
-assignments = {}
+if RUN_NOTEBOOK:
+    assignments = {}
 
-for _, task in df_project.iterrows():
-    # Находим сотрудников, подходящих по жестким ограничениям
-    eligible_emps = get_eligible_employees_for_task(task, df_employees)
+    # Матрица допустимости по жестким ограничениям для всех задач сразу
+    eligibility = build_eligibility_matrix(df_project, df_employees)
 
-    # Добавляем предпочтение для инновационных задач
-    innovation_preferred = get_innovation_preference(task, df_employees)
+    for task_id, emp_id in eligible_pairs(eligibility):
+        var_name = f"assign_{task_id}_{emp_id}"
+        assignments[(task_id, emp_id)] = pulp.LpVariable(var_name, cat='Binary')
 
-    for emp_id in eligible_emps:
-        var_name = f"assign_{task['task_id']}_{emp_id}"
-        assignments[(task['task_id'], emp_id)] = pulp.LpVariable(var_name, cat='Binary')
+    # Индексы переменных по задачам и по сотрудникам для генерации ограничений
+    assignments_by_task, assignments_by_employee = build_assignment_index(assignments)
 
-print(f"Создано {len(assignments)} переменных решения")
+    print(f"Создано {len(assignments)} переменных решения")
 
 # %% [markdown] id="DQJtQJb0OlAT"
 # ### 4. Целевая функция (минимизация затрат)
 
 # %% id="UtlIZuaLO1xr"
 # Целевая функция: Minimize Σ (x_ij * total_effort_hours_i * hourly_rate_j)
-cost_expression = pulp.LpAffineExpression()
-
-for (task_id, emp_id), assignment_var in assignments.items():
-    # Трудозатраты по задаче
-    task_hours = df_project[df_project['task_id'] == task_id]['total_effort_hours'].iloc[0]
-    # Часовая ставка сотрудника
-    emp_rate = df_employees[df_employees['emp_id'] == emp_id]['hourly_rate'].iloc[0]
+# Стоимость считается один раз для всех пар (часы задачи x ставка сотрудника)
+if RUN_NOTEBOOK:
+    cost_matrix = build_cost_matrix(df_project, df_employees)
+    cost_expression = build_cost_expression(assignments, cost_matrix)
 
-    # Добавляем к целевой функции
-    cost_expression += assignment_var * task_hours * emp_rate
+    # Вторая цель: баллы мягких ограничений (инновации, здоровье, локация)
+    preference_matrix = build_preference_matrix(df_project, df_employees)
+    preference_expression = build_cost_expression(assignments, preference_matrix)
 
 # %% id="KS63KvMEO_iF"
 # Устанавливаем целевую функцию
-model += cost_expression, "Total_Project_Cost"
-#print("Целевая функция установлена: минимизация общих затрат")
+if RUN_NOTEBOOK:
+    model += cost_expression, "Total_Project_Cost"
+    #print("Целевая функция установлена: минимизация общих затрат")
 
 # %% [markdown] id="KzvYzat5PCvt"
 # ### 5. Ограничения
 
 # %% id="EIOYEOGyPTBe"
 # 5.1 На каждую задачу должен быть назначен хотя бы один сотрудник
-for task_id in df_project['task_id']:
-    task_assignments = [var for (t_id, emp_id), var in assignments.items() if t_id == task_id]
-    if task_assignments:
-        model += pulp.lpSum(task_assignments) >= 1, f"min_employees_{task_id}"
+if RUN_NOTEBOOK:
+    for task_id in df_project['task_id']:
+        task_assignments = assignments_by_task.get(task_id, [])
+        if task_assignments:
+            model += pulp.lpSum(task_assignments) >= 1, f"min_employees_{task_id}"
 
 # %% id="KdUdwfHbPXF-"
 # 5.2 Не превышать max_employees_per_task
 # Находим ограничение из df_limitations
-max_employees_constraint = df_limitations[
-    df_limitations['constraint_type'] == 'max_employees_per_task'
-]
-max_emps = int(max_employees_constraint['constraint_value'].iloc[0]) if not max_employees_constraint.empty else 3
+if RUN_NOTEBOOK:
+    max_employees_constraint = df_limitations[
+        df_limitations['constraint_type'] == 'max_employees_per_task'
+    ]
+    max_emps = int(max_employees_constraint['constraint_value'].iloc[0]) if not max_employees_constraint.empty else 3
 
-for task_id in df_project['task_id']:
-    task_assignments = [var for (t_id, emp_id), var in assignments.items() if t_id == task_id]
-    if task_assignments:
-        model += pulp.lpSum(task_assignments) <= max_emps, f"max_employees_{task_id}"
+    for task_id in df_project['task_id']:
+        task_assignments = assignments_by_task.get(task_id, [])
+        if task_assignments:
+            model += pulp.lpSum(task_assignments) <= max_emps, f"max_employees_{task_id}"
 
 # %% id="ZUkovsY7PJ90"
 # 5.3 Ограничение по загрузке сотрудников (с учетом отпусков)
-for emp_id in df_employees['emp_id']:
-    emp_assignments = [var for (task_id, e_id), var in assignments.items() if e_id == emp_id]
-    if emp_assignments:
-        # Расчет доступного времени сотрудника
-        emp_data = df_employees[df_employees['emp_id'] == emp_id].iloc[0]
-
-        # Берем данные проекта для расчета длительности
-        project_duration_weeks = df_tasks['total_expected_duration'].iloc[0] / 7
-
-        # Доступное время с учетом текущей загрузки и корректировки здоровья
-        available_hours = (
-            emp_data['max_hours_day'] * 5 *  # 5 дней в неделю
-            project_duration_weeks *          # длительность проекта в неделях
-            (1 - emp_data['workload_pct'] / 100)  # доступность после текущей загрузки
-        )
+# Берем данные проекта для расчета длительности
+if RUN_NOTEBOOK:
+    project_working_days = calendar_day_index(capacity_calendar, df_tasks['total_expected_duration'].iloc[0])
+    task_hours = dict(zip(df_project['task_id'], df_project['total_effort_hours']))
+    available_hours_by_employee = {}
+
+    for emp_data in df_employees.itertuples(index=False):
+        emp_assignments = assignments_by_employee.get(emp_data.emp_id, [])
+        if emp_assignments:
+            # Доступное время по календарю: текущая загрузка, здоровье, отпуска и праздники
+            available_hours = calculate_availability_with_vacation(
+                capacity_calendar, emp_data.emp_id, 0, project_working_days)
+            available_hours_by_employee[emp_data.emp_id] = available_hours
+
+            # Выражение для суммарного времени сотрудника
+            total_hours_expr = pulp.LpAffineExpression(
+                (assignment_var, task_hours[task_id]) for task_id, assignment_var in emp_assignments
+            )
 
-        # Выражение для суммарного времени сотрудника
-        total_hours_expr = pulp.LpAffineExpression()
-        for assignment_var in emp_assignments:
-            # Находим task_id для этого назначения
-            task_id = next(t_id for (t_id, e_id) in assignments.keys()
-                          if assignments[(t_id, e_id)] == assignment_var and e_id == emp_id)
-            task_hours = df_project[df_project['task_id'] == task_id]['total_effort_hours'].iloc[0]
-            total_hours_expr += assignment_var * task_hours
+           # model += total_hours_expr <= available_hours, f"workload_limit_{emp_data.emp_id}"
 
-       # model += total_hours_expr <= available_hours, f"workload_limit_{emp_id}"
+# %% id="Rk5LcQ2wXo7N"
+# 5.4 Совместная локация для задач из team_co_location (в модели, а не проверкой после решения)
+if RUN_NOTEBOOK:
+    co_location_tasks = index_co_location_tasks(df_limitations)
+    location_vars = add_co_location_constraints(model, assignments, df_employees, co_location_tasks)
 
 # %% [markdown] id="pHvNdwy4Prda"
 # ###6. Решение задачи
 
-# %% colab={"base_uri": "https://localhost:8080/"} id="H6QKNSefP2LA" outputId="45c4f46b-f4dc-4569-e67e-753e72cafed4"
-# Решаем задачу оптимизации
-model.solve(pulp.PULP_CBC_CMD(msg=1))
-
-# Проверяем статус решения
-print(f"Статус решения: {pulp.LpStatus[model.status]}")
-
-# %% [markdown] id="6kxmcBuUP82A"
-# ### 7. Анализ результатов
+# %% id="wS7aRmStArT1"
+# Warm start: решение прошлого запуска передается в CBC как начальное (MIP start)
+import json
+import time
 
-# %% colab={"base_uri": "https://localhost:8080/"} id="BsVsDVtXQGkG" outputId="2fbecb63-e6f8-4c96-c690-8588773c2f87"
-# 7.1 Вывод общей стоимости
-if model.status == pulp.LpStatusOptimal:
-    print(f"Общая стоимость проекта: {pulp.value(model.objective):,.2f} руб.")
+WARM_START_PATH = 'allocation_warm_start.json'
 
-    # 7.2 Матрица назначений
-    print(f"\nМАТРИЦА НАЗНАЧЕНИЙ")
-    assignment_results = []
+def load_warm_start(path=WARM_START_PATH):
+    """Загружает матрицу назначений предыдущего решения (None, если ее нет)"""
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+def save_warm_start(assignments, solve_time, cold_solve_time, path=WARM_START_PATH):
+    """Сохраняет активные назначения и время решения для следующего запуска"""
+    active_pairs = [[task_id, emp_id] for (task_id, emp_id), var in assignments.items()
+                    if var.varValue is not None and var.varValue > 0.5]
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({
+            'assignments': active_pairs,
+            'solve_time': solve_time,
+            'cold_solve_time': cold_solve_time,
+        }, f, ensure_ascii=False)
+
+def apply_warm_start(assignments, previous_solution):
+    """Задает начальные значения переменных по предыдущему решению, возвращает число совпавших назначений"""
+    previous_pairs = {tuple(pair) for pair in previous_solution['assignments']}
+    matched = 0
+    for key, var in assignments.items():
+        is_assigned = key in previous_pairs
+        var.setInitialValue(1 if is_assigned else 0)
+        matched += is_assigned
+    return matched
+
+# %% id="rEsCaChE5kQz"
+# Кэш результатов на диске: ключ - хэш нормализованных входных данных и параметров сценария,
+# при повторном запуске на тех же данных решение MIP и расчет CPM берутся из кэша
+import pickle
+
+RESULT_CACHE_DIR = '.result_cache'
+RESULT_CACHE_MAX_BYTES = 256 * 1024 ** 2
+RESULT_CACHE_VERSION = 1  # увеличить при изменении постановки модели или формата записей
+
+class ResultCache:
+    """Content-addressed кэш результатов (pickle-файлы) с вытеснением давно не использованных
+    записей (LRU по времени последнего обращения) при превышении max_bytes"""
+
+    def __init__(self, directory=RESULT_CACHE_DIR, max_bytes=RESULT_CACHE_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, *parts):
+        """Ключ записи: sha256 от частей. Таблицы нормализуются (порядок колонок и строк
+        не важен), массивы хэшируются побайтно, остальное - как JSON с сортировкой ключей"""
+        digest = hashlib.sha256(f"v{RESULT_CACHE_VERSION}".encode())
+        for part in parts:
+            if isinstance(part, pd.DataFrame):
+                columns = sorted(part.columns, key=str)
+                row_hashes = pd.util.hash_pandas_object(part[columns], index=False).to_numpy()
+                digest.update(json.dumps([str(column) for column in columns]).encode())
+                digest.update(np.sort(row_hashes).tobytes())
+            elif isinstance(part, np.ndarray):
+                digest.update(f"{part.dtype.str}{part.shape}".encode())
+                digest.update(np.ascontiguousarray(part).tobytes())
+            else:
+                digest.update(json.dumps(part, sort_keys=True, default=str, ensure_ascii=False).encode())
+        return digest.hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.pkl")
+
+    def get(self, key):
+        """Запись по ключу (None - промах); обращение обновляет время для LRU"""
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                value = pickle.load(f)
+            os.utime(path)
+        except (FileNotFoundError, EOFError, pickle.UnpicklingError):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        """Сохраняет запись (атомарная замена файла) и вытесняет старые при переполнении"""
+        os.makedirs(self.directory, exist_ok=True)
+        temp_path = f"{self._path(key)}.{os.getpid()}.tmp"
+        with open(temp_path, 'wb') as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, self._path(key))
+        self.evict()
+
+    def entries(self):
+        """Записи кэша: [(время обращения, размер, путь)] от давно использованных к недавним"""
+        entries = []
+        for entry in os.scandir(self.directory) if os.path.isdir(self.directory) else []:
+            if entry.name.endswith('.pkl'):
+                try:
+                    info = entry.stat()
+                except FileNotFoundError:  # запись удалил другой процесс
+                    continue
+                entries.append((info.st_mtime, info.st_size, entry.path))
+        return sorted(entries)
+
+    def evict(self):
+        """Удаляет давно не использованные записи, пока размер кэша больше max_bytes"""
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def stats(self):
+        entries = self.entries()
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'entries': len(entries),
+            'bytes': sum(size for _, size, _ in entries),
+        }
 
+    def report(self):
+        """Строка статистики для журнала запуска"""
+        stats = self.stats()
+        return (f"Кэш результатов: попаданий {stats['hits']}, промахов {stats['misses']} "
+                f"({stats['hit_rate']:.0%}), записей {stats['entries']}, {stats['bytes'] / 1024:.0f} КБ")
+
+RESULT_CACHE = ResultCache()
+
+def allocation_result(model, assignments, status, solve_time):
+    """Запись кэша для решенной модели распределения: статус, цель и матрица назначений"""
+    matrix = pd.Series({key: int(round(var.varValue or 0)) for key, var in assignments.items()}, dtype='int8')
+    return {
+        'status': status,
+        'objective': pulp.value(model.objective),
+        'assignment_matrix': matrix.unstack(fill_value=0),
+        'solve_time': solve_time,
+    }
+
+def restore_allocation_result(model, assignments, result):
+    """Переносит решение из кэша в переменные модели (как после model.solve)"""
+    matrix = result['assignment_matrix']
     for (task_id, emp_id), var in assignments.items():
-        if pulp.value(var) > 0.5:  # Назначение активно
-            task_data = df_project[df_project['task_id'] == task_id].iloc[0]
-            emp_data = df_employees[df_employees['emp_id'] == emp_id].iloc[0]
+        var.varValue = int(matrix.at[task_id, emp_id]) if task_id in matrix.index and emp_id in matrix.columns else 0
+    model.status = result['status']
+
+# %% id="hEuR1stIcA7x"
+# Эвристический режим: жадное назначение + локальный поиск вместо CBC
+SOLVER_MODE = 'mip'  # 'mip' - точное решение CBC, 'heuristic' - жадный алгоритм,
+                     # 'lexicographic' - сначала стоимость, затем баллы предпочтений
+LEXICOGRAPHIC_TOLERANCE = 0.0  # допустимое ухудшение цели предыдущего этапа (доля)
+
+def solve_greedy_allocation(assignments, cost_matrix, task_hours, available_hours=None, max_passes=10):
+    """Назначает на каждую задачу самого дешевого допустимого сотрудника, затем чинит
+    превышение загрузки и улучшает план перестановками задач между сотрудниками.
+    Лимит max_employees_per_task выполняется автоматически (по одному сотруднику на задачу)."""
+    task_ids = list(dict.fromkeys(task_id for task_id, _ in assignments))
+    emp_ids = list(dict.fromkeys(emp_id for _, emp_id in assignments))
+    task_pos = {task_id: i for i, task_id in enumerate(task_ids)}
+    emp_pos = {emp_id: j for j, emp_id in enumerate(emp_ids)}
+
+    # Матрица стоимости только по допустимым парам (недопустимые = inf)
+    costs = np.full((len(task_ids), len(emp_ids)), np.inf)
+    all_costs = cost_matrix.loc[task_ids, emp_ids].to_numpy()
+    for task_id, emp_id in assignments:
+        costs[task_pos[task_id], emp_pos[emp_id]] = all_costs[task_pos[task_id], emp_pos[emp_id]]
+    hours = np.array([task_hours[task_id] for task_id in task_ids], dtype=float)
+    capacity = np.array([
+        available_hours.get(emp_id, np.inf) if available_hours else np.inf for emp_id in emp_ids
+    ], dtype=float)
+
+    # 1. Жадное назначение: сначала самые трудоемкие задачи
+    chosen = np.full(len(task_ids), -1)
+    load = np.zeros(len(emp_ids))
+    for t in np.argsort(-hours):
+        fits = np.isfinite(costs[t]) & (load + hours[t] <= capacity)
+        candidates = np.where(fits, costs[t], np.inf)
+        if not np.isfinite(candidates.min()):
+            candidates = costs[t]  # Нет свободных - временно перегружаем, исправит ремонт
+        chosen[t] = int(np.argmin(candidates))
+        load[chosen[t]] += hours[t]
+
+    # 2. Локальный поиск: перенос задачи к другому сотруднику, если это снимает
+    # перегрузку или уменьшает стоимость без новой перегрузки
+    for _ in range(max_passes):
+        improved = False
+        for t in range(len(task_ids)):
+            current = chosen[t]
+            overloaded = load[current] > capacity[current] + 1e-9
+            fits = np.isfinite(costs[t]) & (load + hours[t] <= capacity)
+            fits[current] = False
+            if not fits.any():
+                continue
+            delta = np.where(fits, costs[t] - costs[t, current], np.inf)
+            best = int(np.argmin(delta))
+            if overloaded or delta[best] < -1e-9:
+                load[current] -= hours[t]
+                load[best] += hours[t]
+                chosen[t] = best
+                improved = True
+        if not improved:
+            break
+
+    solution = {(task_id, emp_id): 0 for task_id, emp_id in assignments}
+    for t, j in enumerate(chosen):
+        solution[(task_ids[t], emp_ids[j])] = 1
+    return {
+        'solution': solution,
+        'objective': float(costs[np.arange(len(task_ids)), chosen].sum()) if len(task_ids) else 0.0,
+        'feasible': bool(np.all(load <= capacity + 1e-9)),
+    }
+
+def solve_lp_relaxation_bound(model, assignments):
+    """Нижняя граница стоимости: решение LP-релаксации модели (переменные непрерывные в [0, 1])"""
+    for var in assignments.values():
+        var.cat = pulp.LpContinuous
+    try:
+        model.solve(pulp.PULP_CBC_CMD(msg=0))
+        return pulp.value(model.objective) if model.status == pulp.LpStatusOptimal else None
+    finally:
+        for var in assignments.values():
+            var.cat = pulp.LpBinary
+
+# Оптимумы этапов лексикографического решения: ключ - содержимое модели и целей этапов
+LEXICOGRAPHIC_CACHE = {}
+
+def _model_key(model):
+    """Отпечаток модели: ограничения и границы переменных"""
+    return hash((
+        tuple((name, tuple((var.name, coef) for var, coef in constraint.items()), constraint.constant, constraint.sense)
+              for name, constraint in model.constraints.items()),
+        tuple((var.name, var.lowBound, var.upBound, var.cat) for var in model.variables()),
+    ))
+
+def solve_lexicographic(model, objectives, tolerance=0.0, cache=LEXICOGRAPHIC_CACHE, time_limit=None):
+    """Лексикографическое решение: цели по очереди, оптимум каждой становится ограничением
+    для следующих (с допуском tolerance). objectives - [(name, expression, sense)].
+
+    Оптимумы этапов кэшируются: при повторном запуске или добавлении новой цели в конец
+    списка уже решенные этапы не решаются заново, их значения сразу идут в ограничения.
+    Каждый этап стартует с решения предыдущего (оно допустимо по построению).
+    """
+    original_objective, original_sense = model.objective, model.sense
+    key = _model_key(model)
+    bound_names, stages, solution = [], [], None
+    status = pulp.LpStatusOptimal
+    try:
+        for name, expression, sense in objectives:
+            key = hash((key, name, sense, tolerance, tuple((var.name, coef) for var, coef in expression.items())))
+            cached = key in cache
+            if cached:
+                value, solution, solve_time = cache[key]['value'], cache[key]['solution'], 0.0
+            else:
+                model.setObjective(expression)
+                model.sense = sense
+                if solution is not None:
+                    for var in model.variables():
+                        var.setInitialValue(solution.get(var.name))
+                start_time = time.perf_counter()
+                model.solve(pulp.PULP_CBC_CMD(msg=0, warmStart=solution is not None, timeLimit=time_limit))
+                solve_time = time.perf_counter() - start_time
+                status = model.status
+                if status != pulp.LpStatusOptimal:
+                    stages.append({'name': name, 'status': status, 'value': None,
+                                   'solve_time': solve_time, 'cached': False})
+                    break
+                value = pulp.value(expression)
+                solution = {var.name: var.varValue for var in model.variables()}
+                cache[key] = {'value': value, 'solution': solution}
+            stages.append({'name': name, 'status': pulp.LpStatusOptimal, 'value': value,
+                           'solve_time': solve_time, 'cached': cached})
+
+            # Оптимум этапа - ограничение для следующих целей
+            slack = abs(value) * tolerance
+            bound = expression <= value + slack if sense == pulp.LpMinimize else expression >= value - slack
+            model += bound, f"lexicographic_{name}"
+            bound_names.append(f"lexicographic_{name}")
+    finally:
+        for bound_name in bound_names:
+            model.constraints.pop(bound_name, None)
+        model.setObjective(original_objective)
+        model.sense = original_sense
+
+    # Значения переменных - решение последнего этапа (в том числе взятое из кэша)
+    if solution is not None:
+        for var in model.variables():
+            var.varValue = solution.get(var.name)
+    return {
+        'status': status,
+        'stages': stages,
+        'objectives': {stage['name']: stage['value'] for stage in stages},
+        'solution': solution,
+        'solve_time': sum(stage['solve_time'] for stage in stages),
+    }
 
-            assignment_results.append({
-                'task_id': task_id,
-                'task_name': task_data['task_name'],
-                'emp_id': emp_id,
-                'emp_name': emp_data['emp_name'],
-                'hours': task_data['total_effort_hours'],
-                'hourly_rate': emp_data['hourly_rate'],
-                'cost': task_data['total_effort_hours'] * emp_data['hourly_rate']
-            })
+# %% colab={"base_uri": "https://localhost:8080/"} id="H6QKNSefP2LA" outputId="45c4f46b-f4dc-4569-e67e-753e72cafed4"
+# Решаем задачу оптимизации (точные режимы - через кэш результатов)
+if RUN_NOTEBOOK:
+    allocation_key = RESULT_CACHE.key(
+        'allocation', df_project, df_tasks, df_employees, df_limitations,
+        {'solver_mode': SOLVER_MODE, 'tolerance': LEXICOGRAPHIC_TOLERANCE, 'weights': SOFT_CONSTRAINT_WEIGHTS,
+         'preferred_location': PREFERRED_LOCATION, 'start_date': PROJECT_START_DATE, 'holidays': HOLIDAYS}
+    )
+    cached_allocation = RESULT_CACHE.get(allocation_key) if SOLVER_MODE != 'heuristic' else None
+
+    if cached_allocation is not None:
+        restore_allocation_result(model, assignments, cached_allocation)
+        solution_found = model.status == pulp.LpStatusOptimal
+        print(f"Решение из кэша: {pulp.LpStatus[model.status]}, стоимость {cached_allocation['objective']:,.2f} руб. "
+              f"(исходное время решения {cached_allocation['solve_time']:.2f} с)")
+    elif SOLVER_MODE == 'heuristic':
+        start_time = time.perf_counter()
+        heuristic = solve_greedy_allocation(assignments, cost_matrix, task_hours, available_hours_by_employee)
+        solve_time = time.perf_counter() - start_time
+
+        lower_bound = solve_lp_relaxation_bound(model, assignments)
+        for key, var in assignments.items():
+            var.setInitialValue(heuristic['solution'][key])
+        solution_found = heuristic['feasible']
+
+        print(f"Эвристическое решение: {'допустимое' if solution_found else 'перегрузка не устранена'}")
+        print(f"Время решения: {solve_time:.3f} с")
+        if lower_bound:
+            gap = (heuristic['objective'] - lower_bound) / lower_bound * 100
+            print(f"Нижняя граница (LP-релаксация): {lower_bound:,.2f} руб., разрыв оптимальности: {gap:.2f}%")
+    elif SOLVER_MODE == 'lexicographic':
+        lexicographic = solve_lexicographic(model, [
+            ('cost', cost_expression, pulp.LpMinimize),
+            ('preference', preference_expression, pulp.LpMaximize),
+        ], tolerance=LEXICOGRAPHIC_TOLERANCE)
+        solution_found = lexicographic['status'] == pulp.LpStatusOptimal
+
+        for stage in lexicographic['stages']:
+            source = 'из кэша' if stage['cached'] else f"{stage['solve_time']:.2f} с"
+            print(f"Этап '{stage['name']}': {pulp.LpStatus[stage['status']]}, значение {stage['value']}, {source}")
+        solve_time = lexicographic['solve_time']
+    else:
+        previous_solution = load_warm_start()
+        if previous_solution:
+            matched = apply_warm_start(assignments, previous_solution)
+            print(f"Warm start: {matched} из {len(previous_solution['assignments'])} назначений предыдущего решения")
+
+        start_time = time.perf_counter()
+        model.solve(pulp.PULP_CBC_CMD(msg=1, warmStart=bool(previous_solution)))
+        solve_time = time.perf_counter() - start_time
+
+        # Проверяем статус решения
+        print(f"Статус решения: {pulp.LpStatus[model.status]}")
+        print(f"Время решения: {solve_time:.2f} с")
+
+        if previous_solution:
+            cold_solve_time = previous_solution['cold_solve_time']
+            print(f"Экономия за счет warm start: {cold_solve_time - solve_time:.2f} с "
+                  f"(холодный старт: {cold_solve_time:.2f} с)")
+        else:
+            cold_solve_time = solve_time
 
-            print(f"{task_data['task_name']} -> {emp_data['emp_name']} "
-                  f"({task_data['total_effort_hours']}ч, {emp_data['hourly_rate']} руб/ч)")
+        if model.status == pulp.LpStatusOptimal:
+            save_warm_start(assignments, solve_time, cold_solve_time)
+        solution_found = model.status == pulp.LpStatusOptimal
 
-    # 7.3 Сводная статистика
-    total_cost = sum(item['cost'] for item in assignment_results)
-    total_hours = sum(item['hours'] for item in assignment_results)
+    if cached_allocation is None and SOLVER_MODE != 'heuristic' and solution_found:
+        RESULT_CACHE.put(allocation_key, allocation_result(model, assignments, pulp.LpStatusOptimal, solve_time))
 
-    print(f"\nСВОДНАЯ СТАТИСТИКА")
-    print(f"Общая стоимость: {total_cost:,.2f} руб.")
-    print(f"Общие трудозатраты: {total_hours:.1f} часов")
-    print(f"Количество назначений: {len(assignment_results)}")
+# %% [markdown] id="6kxmcBuUP82A"
+# ### 7. Анализ результатов
 
-else:
-    print("Оптимальное решение не найдено")
+# %% colab={"base_uri": "https://localhost:8080/"} id="BsVsDVtXQGkG" outputId="2fbecb63-e6f8-4c96-c690-8588773c2f87"
+# 7.1 Вывод общей стоимости
+if RUN_NOTEBOOK:
+    if solution_found:
+        print(f"Общая стоимость проекта: {pulp.value(model.objective):,.2f} руб.")
+
+        # 7.2 Матрица назначений
+        print(f"\nМАТРИЦА НАЗНАЧЕНИЙ")
+        assignment_results = []
+
+        for (task_id, emp_id), var in assignments.items():
+            if pulp.value(var) > 0.5:  # Назначение активно
+                task_data = df_project[df_project['task_id'] == task_id].iloc[0]
+                emp_data = df_employees[df_employees['emp_id'] == emp_id].iloc[0]
+
+                assignment_results.append({
+                    'task_id': task_id,
+                    'task_name': task_data['task_name'],
+                    'emp_id': emp_id,
+                    'emp_name': emp_data['emp_name'],
+                    'hours': task_data['total_effort_hours'],
+                    'hourly_rate': emp_data['hourly_rate'],
+                    'cost': task_data['total_effort_hours'] * emp_data['hourly_rate']
+                })
+
+                print(f"{task_data['task_name']} -> {emp_data['emp_name']} "
+                      f"({task_data['total_effort_hours']}ч, {emp_data['hourly_rate']} руб/ч)")
+
+        # 7.3 Сводная статистика
+        total_cost = sum(item['cost'] for item in assignment_results)
+        total_hours = sum(item['hours'] for item in assignment_results)
+
+        print(f"\nСВОДНАЯ СТАТИСТИКА")
+        print(f"Общая стоимость: {total_cost:,.2f} руб.")
+        print(f"Общие трудозатраты: {total_hours:.1f} часов")
+        print(f"Количество назначений: {len(assignment_results)}")
+
+    else:
+        print("Оптимальное решение не найдено")
 
 
 # %% [markdown] id="Hmjq3lU7Qfxs"
@@ -277,8 +948,8 @@ else:
 
 # %% colab={"base_uri": "https://localhost:8080/"} id="UUfZMVlvQPbk" outputId="74397c4a-7c42-4f13-d38a-0df7e45de3d6"
 # Расчет длительности проекта с учетом зависимостей задач
-def calculate_project_duration(tasks_df):
-    """Рассчитывает длительность проекта через критический путь"""
+def build_task_graph(tasks_df):
+    """Строит граф зависимостей задач (узлы с атрибутом duration)"""
     G = nx.DiGraph()
 
     # Добавляем задачи в граф
@@ -293,15 +964,27 @@ def calculate_project_duration(tasks_df):
                 dep = dep.strip()
                 if dep and dep in G.nodes:
                     G.add_edge(dep, task['task_id'])
+    return G
+
+def calculate_project_duration(tasks_df, cache=None):
+    """Рассчитывает длительность проекта через критический путь (cache - ResultCache)"""
+    key = cache.key('critical_path', tasks_df[['task_id', 'pert_expected_duration', 'dependencies']]) if cache else None
+    cached = cache.get(key) if cache else None
+    G = build_task_graph(tasks_df) if cached is None else None
 
-    if not G.nodes:
+    if cached is None and not G.nodes:
         return 0
 
     # Расчет критического пути
     try:
-        # Находим самый длинный путь
-        longest_path = nx.dag_longest_path(G)
-        critical_path_duration = sum(G.nodes[node]['duration'] for node in longest_path)
+        if cached is not None:
+            longest_path, critical_path_duration = cached['critical_path'], cached['duration']
+        else:
+            # Находим самый длинный путь
+            longest_path = nx.dag_longest_path(G)
+            critical_path_duration = sum(G.nodes[node]['duration'] for node in longest_path)
+            if cache:
+                cache.put(key, {'critical_path': longest_path, 'duration': critical_path_duration})
 
         print(f"\nДЛИТЕЛЬНОСТЬ ПРОЕКТА")
         print(f"Критический путь: {longest_path}")
@@ -314,7 +997,413 @@ def calculate_project_duration(tasks_df):
         return max(tasks_df['pert_expected_duration'])
 
 # Вызываем функцию расчета
-project_duration = calculate_project_duration(df_project)
+if RUN_NOTEBOOK:
+    project_duration = calculate_project_duration(df_project, cache=RESULT_CACHE)
+    print(RESULT_CACHE.report())
+
+# %% [markdown] id="iNcrPlAnR9xQ"
+# ### 9. Инкрементальное перепланирование
+
+# %% id="Qm3vTz8LkPq2"
+class IncrementalAllocationPlanner:
+    """Планировщик назначений, который держит модель в памяти и при изменениях
+    пересчитывает только затронутые строки (задачи) и столбцы (сотрудники)"""
+
+    PERT_FIELDS = ('optimistic_days', 'likely_days', 'pessimistic_days')
+    CAPACITY_FIELDS = ('max_hours_day', 'workload_pct', 'vacation_dates')
+
+    def __init__(self, tasks_df, employees_df, max_emps=3, project_duration_weeks=8,
+                 experience_rule=default_experience_rule, calendar=None):
+        self.max_emps = max_emps
+        self.project_duration_weeks = project_duration_weeks
+        self.experience_rule = experience_rule
+
+        self.tasks_df = self._with_effort(tasks_df).set_index('task_id', drop=False)
+        self.employees_df = employees_df.set_index('emp_id', drop=False)
+        if calendar is None:
+            calendar = build_capacity_calendar(self.employees_df, n_calendar_days=project_duration_weeks * 7)
+        self.calendar = calendar
+        self.working_days = calendar_day_index(self.calendar, project_duration_weeks * 7)
+
+        # Матрицы допустимости и стоимости считаются целиком только один раз
+        self.eligibility = build_eligibility_matrix(self.tasks_df, self.employees_df, experience_rule)
+        self.cost_matrix = build_cost_matrix(self.tasks_df, self.employees_df)
+
+        # Переменные, индексы по задачам/сотрудникам, целевая функция и ограничения
+        self.task_vars = {task_id: {} for task_id in self.tasks_df.index}
+        self.employee_vars = {emp_id: {} for emp_id in self.employees_df.index}
+        self.objective = pulp.LpAffineExpression()
+        self.constraints = {}
+        self.solution = {}
+
+        for task_id, emp_id in eligible_pairs(self.eligibility):
+            self._add_variable(task_id, emp_id)
+        for task_id in self.tasks_df.index:
+            self._sync_task_constraints(task_id)
+        for emp_id in self.employees_df.index:
+            self._sync_workload_constraint(emp_id)
+
+    # --- Внутренние операции над переменными и ограничениями ---
+
+    @staticmethod
+    def _with_effort(tasks_df):
+        """Расчет PERT длительности и трудозатрат (как в разделе 1)"""
+        tasks_df = tasks_df.copy()
+        tasks_df['pert_expected_duration'] = (
+            (tasks_df['optimistic_days'] + 4 * tasks_df['likely_days'] + tasks_df['pessimistic_days']) / 6
+        ).round(2)
+        tasks_df['total_effort_hours'] = tasks_df['pert_expected_duration'] * 8
+        return tasks_df
+
+    def _add_variable(self, task_id, emp_id):
+        var = pulp.LpVariable(f"inc_{task_id}_{emp_id}", cat='Binary')
+        self.task_vars[task_id][emp_id] = var
+        self.employee_vars[emp_id][task_id] = var
+        self.objective[var] = float(self.cost_matrix.at[task_id, emp_id])
+
+    def _remove_variable(self, task_id, emp_id):
+        var = self.task_vars[task_id].pop(emp_id)
+        del self.employee_vars[emp_id][task_id]
+        del self.objective[var]
+        self.solution.pop((task_id, emp_id), None)
+
+    def _sync_task_constraints(self, task_id):
+        """Пересобирает ограничения 5.1-5.2 одной задачи"""
+        self.constraints.pop(f"min_emp_{task_id}", None)
+        self.constraints.pop(f"max_emp_{task_id}", None)
+        task_vars = list(self.task_vars.get(task_id, {}).values())
+        if task_vars:
+            self.constraints[f"min_emp_{task_id}"] = pulp.lpSum(task_vars) >= 1
+            self.constraints[f"max_emp_{task_id}"] = pulp.lpSum(task_vars) <= self.max_emps
+        elif task_id in self.tasks_df.index:
+            print(f"Нет подходящих сотрудников для задачи {task_id}")
+
+    def _sync_workload_constraint(self, emp_id):
+        """Пересобирает ограничение 5.3 одного сотрудника"""
+        self.constraints.pop(f"workload_{emp_id}", None)
+        emp_vars = self.employee_vars.get(emp_id, {})
+        if emp_vars:
+            available_hours = calculate_availability_with_vacation(self.calendar, emp_id, 0, self.working_days)
+            hours = self.tasks_df['total_effort_hours']
+            total_hours_expr = pulp.LpAffineExpression(
+                (var, float(hours.at[task_id])) for task_id, var in emp_vars.items()
+            )
+            self.constraints[f"workload_{emp_id}"] = total_hours_expr <= available_hours
+
+    def _rebuild_task_row(self, task_id):
+        """Пересчитывает строку матриц и переменные одной задачи"""
+        affected_emps = set(self.task_vars.get(task_id, {}))
+        for emp_id in list(affected_emps):
+            self._remove_variable(task_id, emp_id)
+
+        task_frame = self.tasks_df.loc[[task_id]]
+        self.eligibility.loc[task_id] = build_eligibility_matrix(
+            task_frame, self.employees_df, self.experience_rule).iloc[0]
+        self.cost_matrix.loc[task_id] = build_cost_matrix(task_frame, self.employees_df).iloc[0]
+
+        new_emps = self.eligibility.columns[self.eligibility.loc[task_id].to_numpy(dtype=bool)]
+        for emp_id in new_emps:
+            self._add_variable(task_id, emp_id)
+
+        self._sync_task_constraints(task_id)
+        for emp_id in affected_emps | set(new_emps):
+            self._sync_workload_constraint(emp_id)
+
+    def _rebuild_employee_column(self, emp_id):
+        """Пересчитывает столбец матриц и переменные одного сотрудника"""
+        affected_tasks = set(self.employee_vars.get(emp_id, {}))
+        for task_id in list(affected_tasks):
+            self._remove_variable(task_id, emp_id)
+
+        emp_frame = self.employees_df.loc[[emp_id]]
+        self.eligibility[emp_id] = build_eligibility_matrix(
+            self.tasks_df, emp_frame, self.experience_rule)[emp_id].to_numpy()
+        self.cost_matrix[emp_id] = build_cost_matrix(self.tasks_df, emp_frame)[emp_id].to_numpy()
+
+        new_tasks = self.eligibility.index[self.eligibility[emp_id].to_numpy(dtype=bool)]
+        for task_id in new_tasks:
+            self._add_variable(task_id, emp_id)
+
+        for task_id in affected_tasks | set(new_tasks):
+            self._sync_task_constraints(task_id)
+        self._sync_workload_constraint(emp_id)
+
+    # --- События изменения данных ---
+
+    def add_task(self, task):
+        """Добавляет задачу (dict или Series с полями csv1)"""
+        task_frame = self._with_effort(pd.DataFrame([task])).set_index('task_id', drop=False)
+        task_id = task_frame.index[0]
+        self.tasks_df = pd.concat([self.tasks_df, task_frame])
+        self.task_vars[task_id] = {}
+        self._rebuild_task_row(task_id)
+
+    def remove_task(self, task_id):
+        """Удаляет задачу и все ее переменные и ограничения"""
+        affected_emps = set(self.task_vars.pop(task_id, {}))
+        for emp_id in affected_emps:
+            var = self.employee_vars[emp_id].pop(task_id)
+            del self.objective[var]
+            self.solution.pop((task_id, emp_id), None)
+        self.tasks_df = self.tasks_df.drop(index=task_id)
+        self.eligibility = self.eligibility.drop(index=task_id)
+        self.cost_matrix = self.cost_matrix.drop(index=task_id)
+        self._sync_task_constraints(task_id)
+        for emp_id in affected_emps:
+            self._sync_workload_constraint(emp_id)
+
+    def update_task(self, task_id, **changes):
+        """Обновляет поля задачи (например, PERT-оценки) и пересчитывает только ее строку"""
+        for column, value in changes.items():
+            self.tasks_df.loc[task_id, column] = value
+        if any(field in changes for field in self.PERT_FIELDS):
+            self.tasks_df.loc[[task_id]] = self._with_effort(self.tasks_df.loc[[task_id]])
+        self._rebuild_task_row(task_id)
+
+    def add_employee(self, employee):
+        """Добавляет сотрудника (dict или Series с полями csv3)"""
+        emp_frame = pd.DataFrame([employee]).set_index('emp_id', drop=False)
+        emp_id = emp_frame.index[0]
+        self.employees_df = pd.concat([self.employees_df, emp_frame])
+        self.calendar = update_capacity_calendar(self.calendar, emp_frame)
+        self.employee_vars[emp_id] = {}
+        self._rebuild_employee_column(emp_id)
+
+    def remove_employee(self, emp_id):
+        """Удаляет сотрудника и все его назначения"""
+        affected_tasks = set(self.employee_vars.pop(emp_id, {}))
+        for task_id in affected_tasks:
+            var = self.task_vars[task_id].pop(emp_id)
+            del self.objective[var]
+            self.solution.pop((task_id, emp_id), None)
+        self.employees_df = self.employees_df.drop(index=emp_id)
+        self.eligibility = self.eligibility.drop(columns=emp_id)
+        self.cost_matrix = self.cost_matrix.drop(columns=emp_id)
+        self.constraints.pop(f"workload_{emp_id}", None)
+        for task_id in affected_tasks:
+            self._sync_task_constraints(task_id)
+
+    def update_employee(self, emp_id, **changes):
+        """Обновляет поля сотрудника; изменение загрузки меняет только его ограничение 5.3"""
+        for column, value in changes.items():
+            self.employees_df.loc[emp_id, column] = value
+        if any(field in self.CAPACITY_FIELDS for field in changes):
+            self.calendar = update_capacity_calendar(self.calendar, self.employees_df.loc[[emp_id]])
+        if all(field in self.CAPACITY_FIELDS for field in changes):
+            self._sync_workload_constraint(emp_id)
+        else:
+            self._rebuild_employee_column(emp_id)
+
+    def apply_events(self, events):
+        """Применяет список событий вида {'type': 'update_employee', 'emp_id': ..., 'workload_pct': ...}"""
+        for event in events:
+            event = dict(event)
+            getattr(self, event.pop('type'))(**event)
+
+    # --- Решение ---
+
+    def solve(self, solver=None):
+        """Собирает модель из сохраненных ограничений и решает с warm start от прошлого решения"""
+        model = pulp.LpProblem("Incremental_Resource_Allocation", pulp.LpMinimize)
+        model += self.objective, "Total_Project_Cost"
+        for name, constraint in self.constraints.items():
+            model += constraint, name
+
+        for (task_id, emp_id), value in self.solution.items():
+            self.task_vars[task_id][emp_id].setInitialValue(value)
+        solver = solver or pulp.PULP_CBC_CMD(msg=0, warmStart=bool(self.solution))
+
+        start_time = time.perf_counter()
+        model.solve(solver)
+        solve_time = time.perf_counter() - start_time
+
+        self.solution = {
+            (task_id, emp_id): var.varValue
+            for task_id, emp_vars in self.task_vars.items()
+            for emp_id, var in emp_vars.items()
+        }
+        print(f"Перепланирование: {pulp.LpStatus[model.status]}, время решения {solve_time:.2f} с")
+        return {
+            'status': model.status,
+            'objective': pulp.value(model.objective),
+            'solution': dict(self.solution),
+            'solve_time': solve_time,
+        }
+
+# %% [markdown] id="Tb4mXq9wLr2c"
+# ### 10. Совместное назначение и расписание (time-indexed MIP)
+
+# %% id="h7RkNc3VzQ1p"
+# Длина периода в рабочих днях календаря емкости; емкость периода - часы сотрудника за эти рабочие дни
+TIME_BUCKETS = {'day': 1, 'week': 5, 'sprint': 10}
+COMPARE_TIME_BUCKETS = False  # сравнение гранулярностей при запуске ноутбука (несколько MIP-решений)
+TIME_BUCKET_TIME_LIMIT = 10  # лимит времени CBC на одну гранулярность, с
+
+def build_time_indexed_model(tasks_df, employees_df, bucket='week', horizon_factor=1.5, makespan_weight=1.0,
+                             experience_rule=default_experience_rule, calendar=None):
+    """Модель, которая одновременно выбирает исполнителя и период начала каждой задачи
+
+    start[(task_id, emp_id, t)] = 1, если задачу выполняет emp_id, начиная с периода t.
+    Исполнитель один: в модели затрат каждый назначенный оплачивает весь объем задачи,
+    поэтому лишние исполнители только увеличивают стоимость. Если емкость сотрудника
+    за период меньше нужного темпа, задача у него длится дольше. Окна начала задач
+    ограничены ранним стартом и запасом до горизонта (horizon_factor x минимальный срок).
+    makespan_weight - стоимость (руб) одного дня срока проекта в целевой функции.
+    Время считается в рабочих днях календаря (calendar, по умолчанию строится по
+    employees_df); емкость периода - доступные часы сотрудника за его рабочие дни.
+    """
+    build_start = time.perf_counter()
+    bucket_days = TIME_BUCKETS[bucket]
+    tasks = tasks_df.set_index('task_id')
+    employees = employees_df.set_index('emp_id')
+    if calendar is None:
+        calendar = build_capacity_calendar(employees_df)
+    # Номинальная емкость периода (без отпусков) задает темп и длительность задачи
+    capacity = pd.Series(calendar['nominal_hours'][calendar['emp_index'].loc[employees.index]] * bucket_days,
+                         index=employees.index)
+    eligibility = build_eligibility_matrix(tasks_df, employees_df, experience_rule)
+
+    # Варианты выполнения задачи: (сотрудник, длительность в периодах)
+    options = {}
+    for task_id in tasks.index:
+        base_periods = max(1, int(np.ceil(tasks.at[task_id, 'pert_expected_duration'] / bucket_days - 1e-9)))
+        emp_ids = eligibility.columns[eligibility.loc[task_id].to_numpy()] if task_id in eligibility.index else []
+        options[task_id] = [
+            (emp_id, max(base_periods, int(np.ceil(tasks.at[task_id, 'total_effort_hours'] / capacity[emp_id] - 1e-9))))
+            for emp_id in emp_ids if capacity[emp_id] > 0
+        ] or [(None, base_periods)]  # Нет подходящих сотрудников: только расписание
+
+    # Окна начала по кратчайшим вариантам (прямой и обратный проход)
+    G = build_task_graph(tasks_df)
+    order = list(nx.topological_sort(G))
+    shortest = {task_id: min(periods for _, periods in options[task_id]) for task_id in order}
+    earliest, successor_tail = {}, {}
+    for task_id in order:
+        earliest[task_id] = max((earliest[p] + shortest[p] for p in G.predecessors(task_id)), default=0)
+    for task_id in reversed(order):
+        successor_tail[task_id] = max((successor_tail[s] + shortest[s] for s in G.successors(task_id)), default=0)
+    min_makespan = max((earliest[t] + shortest[t] for t in order), default=0)
+    horizon = max(int(np.ceil(min_makespan * horizon_factor)), min_makespan)
+    if len(calendar['dates']) < horizon * bucket_days:
+        calendar = build_capacity_calendar(employees_df, calendar['start_date'],
+                                           2 * horizon * bucket_days + 30, calendar['holidays'])
+
+    model = pulp.LpProblem(f"Time_Indexed_Allocation_{bucket}", pulp.LpMinimize)
+    start_vars = {}
+    finish_terms = {task_id: [] for task_id in order}
+    start_terms = {task_id: [] for task_id in order}
+    load_terms = {}
+    cost_terms = []
+    for task_id in order:
+        for emp_id, periods in options[task_id]:
+            latest = horizon - periods - successor_tail[task_id]
+            for t in range(earliest[task_id], latest + 1):
+                var = pulp.LpVariable(f"ts_{task_id}_{emp_id}_{t}", cat='Binary')
+                start_vars[(task_id, emp_id, t)] = var
+                start_terms[task_id].append((var, t))
+                finish_terms[task_id].append((var, t + periods))
+                if emp_id is not None:
+                    cost_terms.append((var, tasks.at[task_id, 'total_effort_hours'] * employees.at[emp_id, 'hourly_rate']))
+                    rate = tasks.at[task_id, 'total_effort_hours'] / periods
+                    for period in range(t, t + periods):
+                        load_terms.setdefault((emp_id, period), []).append((var, rate))
+
+    makespan = pulp.LpVariable("makespan", lowBound=0)
+    model += (pulp.LpAffineExpression(cost_terms) + makespan_weight * bucket_days * makespan,
+              "Total_Cost_And_Duration")
+
+    for task_id in order:
+        model += pulp.lpSum(var for var, _ in start_terms[task_id]) == 1, f"start_{task_id}"
+        if G.out_degree(task_id) == 0:
+            model += makespan >= pulp.LpAffineExpression(finish_terms[task_id]), f"makespan_{task_id}"
+    for pred, succ in G.edges:
+        model += (pulp.LpAffineExpression(start_terms[succ]) >= pulp.LpAffineExpression(finish_terms[pred]),
+                  f"precedence_{pred}_{succ}")
+    # Емкость всех пар (сотрудник, период) одним запросом к префиксным суммам календаря
+    load_keys = list(load_terms)
+    periods = np.array([period for _, period in load_keys], dtype=np.int64)
+    available_hours = calculate_availability_with_vacation(
+        calendar, [emp_id for emp_id, _ in load_keys], periods * bucket_days, (periods + 1) * bucket_days)
+    for (emp_id, period), hours_limit in zip(load_keys, available_hours):
+        model += pulp.LpAffineExpression(load_terms[(emp_id, period)]) <= hours_limit, f"capacity_{emp_id}_{period}"
+
+    return {
+        'model': model,
+        'start_vars': start_vars,
+        'makespan': makespan,
+        'bucket': bucket,
+        'bucket_days': bucket_days,
+        'horizon': horizon,
+        'options': options,
+        'calendar': calendar,
+        'build_time': time.perf_counter() - build_start,
+    }
+
+def time_indexed_model_size(time_indexed_model):
+    """Размер модели: переменные, ограничения, ненулевые коэффициенты"""
+    model = time_indexed_model['model']
+    return {
+        'variables': len(time_indexed_model['start_vars']) + 1,
+        'constraints': len(model.constraints),
+        'nonzeros': sum(len(constraint) for constraint in model.constraints.values()),
+    }
+
+def solve_time_indexed_model(time_indexed_model, solver=None):
+    """Решает совместную модель; расписание - в рабочих днях от начала проекта и в датах календаря"""
+    model = time_indexed_model['model']
+    bucket_days = time_indexed_model['bucket_days']
+    start_time = time.perf_counter()
+    model.solve(solver or pulp.PULP_CBC_CMD(msg=0))
+    solve_time = time.perf_counter() - start_time
+
+    rows = []
+    options = time_indexed_model['options']
+    for (task_id, emp_id, t), var in time_indexed_model['start_vars'].items():
+        if var.varValue is not None and var.varValue > 0.5:
+            periods = dict(options[task_id])[emp_id]
+            rows.append({'task_id': task_id, 'emp_id': emp_id,
+                         'start_day': t * bucket_days, 'finish_day': (t + periods) * bucket_days})
+    schedule = pd.DataFrame(rows, columns=['task_id', 'emp_id', 'start_day', 'finish_day'])
+    calendar = time_indexed_model['calendar']
+    schedule['start_date'] = working_day_dates(calendar, schedule['start_day'])
+    schedule['finish_date'] = working_day_dates(calendar, schedule['finish_day'] - 1)
+
+    return {
+        'bucket': time_indexed_model['bucket'],
+        'status': model.status,
+        'sol_status': model.sol_status,
+        'objective': pulp.value(model.objective),
+        'makespan_days': schedule['finish_day'].max() if len(schedule) else None,
+        'schedule': schedule,
+        'build_time': time_indexed_model['build_time'],
+        'solve_time': solve_time,
+        **time_indexed_model_size(time_indexed_model),
+    }
+
+def compare_time_buckets(tasks_df, employees_df, buckets=('week', 'sprint'), time_limit=TIME_BUCKET_TIME_LIMIT,
+                         **model_kwargs):
+    """Строит и решает модель для каждой гранулярности: размер модели против времени и точности"""
+    results = {}
+    for bucket in buckets:
+        time_indexed_model = build_time_indexed_model(tasks_df, employees_df, bucket, **model_kwargs)
+        results[bucket] = solve_time_indexed_model(time_indexed_model, pulp.PULP_CBC_CMD(msg=0, timeLimit=time_limit))
+
+    summary = pd.DataFrame([
+        {key: result[key] for key in ('bucket', 'variables', 'constraints', 'nonzeros',
+                                      'build_time', 'solve_time', 'objective', 'makespan_days')}
+        | {'status': pulp.LpSolution[result['sol_status']]}
+        for result in results.values()
+    ]).set_index('bucket')
+    print("\nСОВМЕСТНОЕ НАЗНАЧЕНИЕ И РАСПИСАНИЕ ПО ГРАНУЛЯРНОСТИ:")
+    for bucket, row in summary.iterrows():
+        print(f"{bucket}: {row['variables']} переменных, {row['constraints']} ограничений, "
+              f"{row['nonzeros']} ненулевых; построение {row['build_time']:.2f} с, решение {row['solve_time']:.2f} с; "
+              f"{row['status']}, срок {row['makespan_days']} рабочих дней")
+    return summary, results
+
+# %% id="pW3cYx8sJd0G"
+if RUN_NOTEBOOK and COMPARE_TIME_BUCKETS:
+    time_bucket_summary, time_bucket_results = compare_time_buckets(df_project, df_employees, calendar=capacity_calendar)
 
 # %% [markdown] id="XldFsc_8veMz"
 # ##ШПАРГАЛКА
@@ -366,207 +1455,345 @@ project_duration = calculate_project_duration(df_project)
 #
 # ##**СПИСОК ФУНКЦИЙ**
 # ### **Оптимизация**
+# - build_eligibility_matrix() - матрица допустимости задача x сотрудник
+# - eligible_pairs() - пары (задача, сотрудник) из матрицы допустимости
+# - build_cost_matrix() - матрица стоимости задача x сотрудник
+# - build_cost_expression() - целевая функция по матрице стоимости
+# - build_assignment_index() - индексы переменных по задачам и сотрудникам
 # - get_eligible_employees_for_task() - находит подходящих сотрудников для задачи
-# - get_eligible_employees_base() - middle-сотрудники для базового сценария
-# - get_eligible_employees_quality() - senior-сотрудники для сценария качества
+# - middle_experience_rule() - middle-сотрудники для базового сценария
+# - senior_experience_rule() - senior-сотрудники для сценария качества
 # - add_basic_constraints() - lобавляет ограничения в модель
+# - build_scenario_model() - общая модель для всех сценариев
+# - solve_scenario() - решает сценарий фиксацией переменных общей модели
+# - solve_scenarios() - решает список сценариев на одной модели
+# - solve_scenarios_parallel() - решает сценарии в пуле процессов
+# - find_allocation_components() - независимые блоки задач и сотрудников
+# - solve_decomposed_allocation() - решает блоки отдельными MIP параллельно
+# - IncrementalAllocationPlanner - инкрементальное перепланирование по событиям
+# - build_time_indexed_model() / solve_time_indexed_model() - совместное назначение и расписание по периодам
+# - compare_time_buckets() - размер и время решения модели для day/week/sprint
 # - solve_variant_10_base_scenario() - решает базовый сценарий
 # - solve_variant_10_quality_scenario() - решает сценарий качества
 #
+# - solve_greedy_allocation() - эвристическое назначение с локальным поиском
+# - solve_lp_relaxation_bound() - нижняя граница стоимости (LP-релаксация)
+# - build_preference_matrix() - баллы мягких ограничений (инновации, здоровье, локация)
+# - solve_lexicographic() - многокритериальное решение по этапам с кэшем оптимумов
+#
 # ### **Вспомогательные**
+# - load_dataset() - загрузка csv по схеме с бинарным кэшем
+# - apply_schema() - проверка и типизация датасета
+# - load_warm_start() / save_warm_start() - решение прошлого запуска для warm start
+# - apply_warm_start() - задает начальные значения переменных (MIP start)
 # - parse_vacation_dates() - парсит даты отпусков из строки
 # - calculate_availability_with_vacation() - расчет доступности с учетом отпусков
+# - build_capacity_calendar() - календарь: часы сотрудник x рабочий день и префиксные суммы
+# - update_capacity_calendar() - пересчет строк календаря для измененных сотрудников
+# - calendar_day_index() / working_day_dates() - перевод календарных дней и дат в рабочие дни и обратно
 # - calculate_project_duration() - расчет длительности проекта
 # - build_task_graph() - строит граф зависимостей задач
+# - build_dependency_edges() - зависимости задач в виде массивов ребер
+# - compute_cpm() - прямой и обратный проходы CPM на массивах
 # - calculate_critical_path() - находит критический путь
+# - daily_load_profile() - нагрузка по дням разностным массивом (вектор или матрица)
+# - analyze_resource_loading() / build_resource_load_matrix() - загрузка проекта и сотрудник x день
+# - serial_schedule_generation() / level_resources() - выравнивание ресурсов (serial SGS по LS)
+# - sample_task_durations() - выборка длительностей (Beta-PERT / треугольное)
+# - simulate_schedule_risk() - Монте-Карло: распределение срока и индексы критичности (criticality=False - только срок)
+# - simulate_schedule_risk_parallel() - Монте-Карло в пуле процессов (потоки случайных чисел по блокам, прогресс по сериям)
+# - completion_probability_curve() - вероятности завершения для массива сроков (кэш среднего и дисперсии)
+# - add_gantt_traces() - диаграмма Ганта групповыми трассами ('bars' / 'webgl' / 'aggregated')
+# - export_dashboard_html() - компактный HTML: общий plotly.js, прореживание рядов, base64, отчет по панелям
+# - build_portfolio() - дашборды всех проектов папки в пуле процессов, индекс портфеля, пропуск неизмененных
+# - ResultCache / RESULT_CACHE - кэш решений MIP и CPM на диске (ключ - хэш входных данных, LRU)
+# - generate_synthetic_project() / run_benchmark() - синтетические проекты и время этапов конвейера (JSON)
 # - analyze_variant_10_results() - анализирует результаты сравнения
 # - get_employee_info() - форматирует информацию о сотруднике
 # - analyze_employee_distribution() - анализ распределения по опыту
 #
 # ### **Анализ**
 # - check_location_constraint() - проверяет требование совместной локации
+# - index_co_location_tasks() - задачи с team_co_location (разбор affected_tasks один раз)
+# - add_co_location_constraints() - совместная локация как ограничения MIP (индикаторы локаций)
 # - get_innovation_preference() - находит сотрудников для инновационных задач
 
 # %% [markdown] id="EsCzWPZcRcFq"
 # ## ВАРИАНТ 10
 
 # %% colab={"base_uri": "https://localhost:8080/"} id="YGPE1oE3RgAW" outputId="d1fa0bb9-185a-4577-f1af-2ccccec41d4b"
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
 import pandas as pd
 import pulp
 
-def solve_variant_10_base_scenario():
-    """Базовый сценарий: ТОЛЬКО middle-разработчики (опыт 3-4 года) на задачи с высокой видимостью"""
+# Правила опыта для сценариев варианта 10 (для остальных задач - минимальный опыт 3 года)
+def middle_experience_rule(experience, high_visibility):
+    """ТОЛЬКО middle-разработчики (опыт 3-4 года) для задач с высокой видимостью"""
+    return np.where(high_visibility, (experience >= 3) & (experience <= 4), experience >= 3)
+
+def senior_experience_rule(experience, high_visibility):
+    """ТОЛЬКО senior-разработчики (опыт ≥5 лет) для задач с высокой видимостью"""
+    return np.where(high_visibility, experience >= 5, experience >= 3)
+
+def any_experience_rule(experience, high_visibility):
+    """Без ограничения по опыту: объединение допустимых пар всех сценариев"""
+    return np.ones(np.broadcast_shapes(experience.shape, high_visibility.shape), dtype=bool)
+
+# Сценарий - это набор отличий от общей модели:
+#   'name'             - название сценария
+#   'experience_rule'  - правило опыта для build_eligibility_matrix()
+#   'eligibility_mask' - дополнительная булева матрица задача x сотрудник
+#   'max_employees'    - лимит сотрудников на задачу (число или {task_id: лимит})
+#   'cost_multipliers' - коэффициенты ставок {emp_id: множитель}
+VARIANT_10_BASE = {'name': 'base', 'experience_rule': middle_experience_rule}
+VARIANT_10_QUALITY = {'name': 'quality', 'experience_rule': senior_experience_rule}
+
+def build_scenario_model(tasks_df, employees_df, name="Scenario_Model", calendar=None, horizon_days=56,
+                         co_location_tasks=()):
+    """Строит общую модель один раз для всех сценариев"""
+    # Переменные создаются для всех пар, допустимых хотя бы в одном сценарии
+    eligibility = build_eligibility_matrix(tasks_df, employees_df, any_experience_rule)
+
+    model = pulp.LpProblem(name, pulp.LpMinimize)
+    assignments = {}
+    for task_id, emp_id in eligible_pairs(eligibility):
+        var_name = f"scn_{task_id}_{emp_id}"
+        assignments[(task_id, emp_id)] = pulp.LpVariable(var_name, cat='Binary')
+
+    cost_matrix = build_cost_matrix(tasks_df, employees_df)
+    cost_expression = build_cost_expression(assignments, cost_matrix)
+    model += cost_expression, "Total_Cost"
+
+    task_constraints = add_basic_constraints(model, assignments, tasks_df, employees_df, calendar, horizon_days)
+    add_co_location_constraints(model, assignments, employees_df, co_location_tasks)
+
+    return {
+        'model': model,
+        'task_constraints': task_constraints,
+        'assignments': assignments,
+        'tasks_df': tasks_df,
+        'employees_df': employees_df,
+        'cost_matrix': cost_matrix,
+        'cost_expression': cost_expression,
+    }
+
+def get_scenario_eligibility(scenario_model, scenario):
+    """Матрица допустимости сценария в координатах общей модели"""
+    tasks_df, employees_df = scenario_model['tasks_df'], scenario_model['employees_df']
+    experience_rule = scenario.get('experience_rule', default_experience_rule)
+    eligibility = build_eligibility_matrix(tasks_df, employees_df, experience_rule)
+    if scenario.get('eligibility_mask') is not None:
+        mask = pd.DataFrame(scenario['eligibility_mask']).reindex_like(eligibility)
+        eligibility &= mask.fillna(False).astype(bool)
+    return eligibility
+
+def solve_scenario(scenario_model, scenario, solver=None):
+    """Решает сценарий на общей модели: фиксирует недопустимые переменные вместо перестроения"""
+    model = scenario_model['model']
+    assignments = scenario_model['assignments']
+    cost_matrix = scenario_model['cost_matrix']
+    solver = solver or pulp.PULP_CBC_CMD(msg=0)
+
+    # 1. Недопустимые в сценарии переменные фиксируются в 0
+    eligibility = get_scenario_eligibility(scenario_model, scenario)
+    task_ids, emp_ids = zip(*assignments.keys()) if assignments else ((), ())
+    allowed = eligibility.to_numpy()[
+        eligibility.index.get_indexer(task_ids), eligibility.columns.get_indexer(emp_ids)
+    ]
+    for var, is_allowed in zip(assignments.values(), allowed):
+        var.upBound = 1 if is_allowed else 0
+
+    # 2. Лимиты и задачи без допустимых сотрудников меняют только правые части ограничений
+    saved_constants = []
+    max_employees = scenario.get('max_employees')
+    allowed_per_task = eligibility.sum(axis=1)
+    for task_id, n_allowed in allowed_per_task.items():
+        if task_id not in scenario_model['task_constraints']:
+            continue
+        min_constraint, max_constraint = scenario_model['task_constraints'][task_id]
+        if n_allowed == 0:
+            print(f"Нет подходящих сотрудников для задачи {task_id}")
+            saved_constants.append((min_constraint, min_constraint.constant))
+            min_constraint.constant = 0
+        if max_employees is not None:
+            cap = max_employees.get(task_id) if isinstance(max_employees, dict) else max_employees
+            if cap is not None:
+                saved_constants.append((max_constraint, max_constraint.constant))
+                max_constraint.constant = -cap
+
+    # 3. Коэффициенты стоимости пересчитываются по матрице без перестроения модели
+    if scenario.get('cost_multipliers'):
+        multipliers = pd.Series(scenario['cost_multipliers']).reindex(cost_matrix.columns).fillna(1.0)
+        model.setObjective(build_cost_expression(assignments, cost_matrix * multipliers.to_numpy()))
 
-    # Копируем данные чтобы не менять оригинальные
-    tasks_df = df_project.copy()
-    employees_df = df_employees.copy()
-
-    # Создаем модель для базового сценария
-    model_base = pulp.LpProblem("Variant10_Base_Scenario", pulp.LpMinimize)
-    assignments_base = {}
-
-    # Функция для проверки подходящих сотрудников (ТОЛЬКО middle: опыт 3-4 года)
-    def get_eligible_employees_base(task, employees_df):
-        eligible_employees = []
-
-        for _, emp in employees_df.iterrows():
-            # Проверка навыков
-            skill_ok = (
-                (emp['primary_skill'] == task['skill_1'] and emp['skill_level'] >= 7) or
-                (emp['secondary_skill'] == task['skill_1'] and emp['sec_skill_level'] >= 7) or
-                (emp['primary_skill'] == task['skill_2'] and emp['skill_level'] >= 7) or
-                (emp['secondary_skill'] == task['skill_2'] and emp['sec_skill_level'] >= 7)
+    try:
+        print(f"Решение сценария '{scenario['name']}' ({int(allowed.sum())} допустимых переменных)...")
+        start_time = time.perf_counter()
+        model.solve(solver)
+        result = {
+            'name': scenario['name'],
+            'status': model.status,
+            'sol_status': model.sol_status,
+            'objective': pulp.value(model.objective),
+            'solution': {key: var.varValue for key, var in assignments.items()},
+            'solve_time': time.perf_counter() - start_time,
+        }
+    finally:
+        # Возвращаем общую модель в исходное состояние
+        for var in assignments.values():
+            var.upBound = 1
+        for constraint, constant in saved_constants:
+            constraint.constant = constant
+        model.setObjective(scenario_model['cost_expression'])
+
+    return result
+
+def solve_scenarios(scenario_model, scenarios, solver=None):
+    """Решает список сценариев на одной общей модели"""
+    return {scenario['name']: solve_scenario(scenario_model, scenario, solver) for scenario in scenarios}
+
+# Общая модель передается в каждый процесс пула один раз при его запуске
+_worker_scenario_model = None
+
+def _init_scenario_worker(scenario_model):
+    global _worker_scenario_model
+    _worker_scenario_model = scenario_model
+
+def _solve_scenario_in_worker(scenario, time_limit):
+    solver = pulp.PULP_CBC_CMD(msg=0, timeLimit=time_limit)
+    return solve_scenario(_worker_scenario_model, scenario, solver)
+
+def solve_scenarios_parallel(scenario_model, scenarios, max_workers=None, time_limit=None, on_result=None):
+    """Решает независимые сценарии в пуле процессов, собирая результаты по мере готовности
+
+    Правила и маски сценариев должны сериализоваться pickle (функции уровня модуля, не lambda).
+    time_limit - ограничение времени CBC на один сценарий (сек), on_result(result) вызывается
+    для каждого готового сценария.
+    """
+    results = {}
+    max_workers = min(max_workers or os.cpu_count() or 1, len(scenarios)) or 1
+    with ProcessPoolExecutor(max_workers=max_workers,
+                             initializer=_init_scenario_worker,
+                             initargs=(scenario_model,)) as executor:
+        futures = {
+            executor.submit(_solve_scenario_in_worker, scenario, time_limit): scenario['name']
+            for scenario in scenarios
+        }
+        for future in as_completed(futures):
+            result = future.result()
+            results[futures[future]] = result
+            print(f"Сценарий '{result['name']}': {pulp.LpStatus[result['status']]}, "
+                  f"время решения {result['solve_time']:.2f} с")
+            if on_result is not None:
+                on_result(result)
+
+    # Порядок результатов совпадает с порядком сценариев
+    return {scenario['name']: results[scenario['name']] for scenario in scenarios}
+
+def find_allocation_components(eligibility):
+    """Компоненты связности двудольного графа задача-сотрудник по матрице допустимости"""
+    G = nx.Graph()
+    G.add_edges_from((('task', task_id), ('emp', emp_id)) for task_id, emp_id in eligible_pairs(eligibility))
+    components = []
+    for nodes in nx.connected_components(G):
+        task_ids = [node_id for kind, node_id in nodes if kind == 'task']
+        emp_ids = [node_id for kind, node_id in nodes if kind == 'emp']
+        components.append((task_ids, emp_ids))
+    # Сначала самые крупные блоки, чтобы они раньше ушли в пул
+    return sorted(components, key=lambda component: -len(component[0]) * len(component[1]))
+
+def _solve_allocation_component(name, tasks_df, employees_df, scenario, time_limit, co_location_tasks=()):
+    component_model = build_scenario_model(tasks_df, employees_df, name, co_location_tasks=co_location_tasks)
+    solver = pulp.PULP_CBC_CMD(msg=0, timeLimit=time_limit)
+    return solve_scenario(component_model, dict(scenario, name=name), solver)
+
+def solve_decomposed_allocation(tasks_df, employees_df, scenario=VARIANT_10_BASE, max_workers=None, time_limit=None,
+                                co_location_tasks=()):
+    """Разбивает модель на независимые блоки (задачи и сотрудники, связанные через навыки)
+    и решает каждый блок отдельной MIP-моделью в пуле процессов"""
+    eligibility = get_scenario_eligibility({'tasks_df': tasks_df, 'employees_df': employees_df}, scenario)
+    components = find_allocation_components(eligibility)
+    unassignable = [task_id for task_id in tasks_df['task_id'] if not eligibility.loc[task_id].any()]
+    print(f"Модель разбита на {len(components)} независимых блоков, "
+          f"задач без подходящих сотрудников: {len(unassignable)}")
+
+    results = []
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = [
+            executor.submit(
+                _solve_allocation_component,
+                f"component_{i}",
+                tasks_df[tasks_df['task_id'].isin(task_ids)],
+                employees_df[employees_df['emp_id'].isin(emp_ids)],
+                scenario,
+                time_limit,
+                co_location_tasks,
             )
+            for i, (task_ids, emp_ids) in enumerate(components)
+        ]
+        for future in as_completed(futures):
+            results.append(future.result())
+
+    # Объединяем блоки в один план: статус плана - первый неоптимальный статус блока
+    non_optimal = [result['status'] for result in results if result['status'] != pulp.LpStatusOptimal]
+    merged_solution = {}
+    for result in results:
+        merged_solution.update(result['solution'])
+    return {
+        'name': scenario['name'],
+        'status': non_optimal[0] if non_optimal else pulp.LpStatusOptimal,
+        'objective': sum(result['objective'] or 0 for result in results),
+        'solution': merged_solution,
+        'solve_time': max((result['solve_time'] for result in results), default=0.0),
+        'components': len(components),
+    }
+
+def solve_variant_10_base_scenario(scenario_model):
+    """Базовый сценарий: ТОЛЬКО middle-разработчики (опыт 3-4 года) на задачи с высокой видимостью"""
+    return solve_scenario(scenario_model, VARIANT_10_BASE)
 
-            # Проверка security clearance
-            security_ok = emp['security_clear'] >= task['min_security']
-
-            # ИСПРАВЛЕНИЕ: ТОЛЬКО middle-разработчики (опыт 3-4 года) для задач с высокой видимостью
-            experience_ok = True
-            if task['client_visibility'] == 'Высокая':
-                experience_ok = (emp['experience'] >= 3) and (emp['experience'] <= 4)  # ТОЛЬКО 3-4 года!
-            else:
-                experience_ok = emp['experience'] >= 3  # Для остальных задач - минимальный опыт 3 года
-
-            if skill_ok and security_ok and experience_ok:
-                eligible_employees.append(emp['emp_id'])
-
-        return eligible_employees
-
-    # Создаем переменные
-    print("Создание переменных для базового сценария (middle-only)...")
-    for _, task in tasks_df.iterrows():
-        eligible_emps = get_eligible_employees_base(task, employees_df)
-
-        for emp_id in eligible_emps:
-            var_name = f"base_{task['task_id']}_{emp_id}"
-            assignments_base[(task['task_id'], emp_id)] = pulp.LpVariable(var_name, cat='Binary')
-
-    print(f"Создано {len(assignments_base)} переменных для базового сценария")
-
-    # Целевая функция
-    cost_base = pulp.LpAffineExpression()
-    for (task_id, emp_id), var in assignments_base.items():
-        task_hours = tasks_df[tasks_df['task_id'] == task_id]['total_effort_hours'].iloc[0]
-        emp_rate = employees_df[employees_df['emp_id'] == emp_id]['hourly_rate'].iloc[0]
-        cost_base += var * task_hours * emp_rate
-
-    model_base += cost_base, "Total_Cost_Base"
-
-    # Добавляем ограничения
-    add_basic_constraints(model_base, assignments_base, tasks_df, employees_df)
-
-    # Решаем
-    print("Решение базового сценария...")
-    model_base.solve(pulp.PULP_CBC_CMD(msg=0))
-
-    return model_base, assignments_base
-
-def solve_variant_10_quality_scenario():
+def solve_variant_10_quality_scenario(scenario_model):
     """Сценарий качества: ТОЛЬКО senior-разработчики (опыт ≥5 лет) на задачи с высокой видимостью"""
+    return solve_scenario(scenario_model, VARIANT_10_QUALITY)
 
-    tasks_df = df_project.copy()
-    employees_df = df_employees.copy()
-
-    # Функция для проверки senior-разработчиков
-    def get_eligible_employees_quality(task, employees_df):
-        eligible_employees = []
-
-        for _, emp in employees_df.iterrows():
-            # Проверка навыков
-            skill_ok = (
-                (emp['primary_skill'] == task['skill_1'] and emp['skill_level'] >= 7) or
-                (emp['secondary_skill'] == task['skill_1'] and emp['sec_skill_level'] >= 7) or
-                (emp['primary_skill'] == task['skill_2'] and emp['skill_level'] >= 7) or
-                (emp['secondary_skill'] == task['skill_2'] and emp['sec_skill_level'] >= 7)
-            )
-
-            # Проверка security clearance
-            security_ok = emp['security_clear'] >= task['min_security']
-
-            # ИСПРАВЛЕНИЕ: ТОЛЬКО senior-разработчики (опыт ≥5 лет) для задач с высокой видимостью
-            experience_ok = True
-            if task['client_visibility'] == 'Высокая':
-                experience_ok = emp['experience'] >= 5  # ТОЛЬКО ≥5 лет!
-            else:
-                experience_ok = emp['experience'] >= 3  # Для остальных задач - минимальный опыт 3 года
-
-            if skill_ok and security_ok and experience_ok:
-                eligible_employees.append(emp['emp_id'])
-
-        return eligible_employees
-
-    # Создаем модель для сценария качества
-    model_quality = pulp.LpProblem("Variant10_Quality_Scenario", pulp.LpMinimize)
-    assignments_quality = {}
-
-    # Создаем переменные с новыми ограничениями
-    print("Создание переменных для сценария качества (senior-only)...")
-    for _, task in tasks_df.iterrows():
-        eligible_emps = get_eligible_employees_quality(task, employees_df)
-
-        for emp_id in eligible_emps:
-            var_name = f"quality_{task['task_id']}_{emp_id}"
-            assignments_quality[(task['task_id'], emp_id)] = pulp.LpVariable(var_name, cat='Binary')
-
-    print(f"Создано {len(assignments_quality)} переменных для сценария качества")
-
-    # Целевая функция
-    cost_quality = pulp.LpAffineExpression()
-    for (task_id, emp_id), var in assignments_quality.items():
-        task_hours = tasks_df[tasks_df['task_id'] == task_id]['total_effort_hours'].iloc[0]
-        emp_rate = employees_df[employees_df['emp_id'] == emp_id]['hourly_rate'].iloc[0]
-        cost_quality += var * task_hours * emp_rate
-
-    model_quality += cost_quality, "Total_Cost_Quality"
-
-    # Добавляем ограничения
-    add_basic_constraints(model_quality, assignments_quality, tasks_df, employees_df)
-
-    # Решаем
-    print("Решение сценария качества...")
-    model_quality.solve(pulp.PULP_CBC_CMD(msg=0))
-
-    return model_quality, assignments_quality
-
-def add_basic_constraints(model, assignments, tasks_df, employees_df):
-    """Добавляет базовые ограничения в модель"""
+def add_basic_constraints(model, assignments, tasks_df, employees_df, calendar=None, horizon_days=56):
+    """Добавляет базовые ограничения в модель, возвращает {task_id: (min, max)} ограничений задач"""
+    by_task, by_employee = build_assignment_index(assignments)
 
     # 1. Минимум 1 сотрудник на задачу
-    for task_id in tasks_df['task_id']:
-        task_vars = [var for (t_id, emp_id), var in assignments.items() if t_id == task_id]
-        if task_vars:
-            model += pulp.lpSum(task_vars) >= 1, f"min_emp_{task_id}"
-        else:
-            print(f"Нет подходящих сотрудников для задачи {task_id}")
-
     # 2. Максимум сотрудников на задачу
     max_emps = 3
+    task_constraints = {}
     for task_id in tasks_df['task_id']:
-        task_vars = [var for (t_id, emp_id), var in assignments.items() if t_id == task_id]
+        task_vars = by_task.get(task_id, [])
         if task_vars:
-            model += pulp.lpSum(task_vars) <= max_emps, f"max_emp_{task_id}"
+            # PuLP заменяет '-' в именах ограничений, поэтому сохраняем сами объекты
+            min_constraint = pulp.lpSum(task_vars) >= 1
+            max_constraint = pulp.lpSum(task_vars) <= max_emps
+            model += min_constraint, f"min_emp_{task_id}"
+            model += max_constraint, f"max_emp_{task_id}"
+            task_constraints[task_id] = (min_constraint, max_constraint)
+        else:
+            print(f"Нет подходящих сотрудников для задачи {task_id}")
 
-    # 3. Ограничение по загрузке
-    for emp_id in employees_df['emp_id']:
-        emp_vars = [var for (t_id, e_id), var in assignments.items() if e_id == emp_id]
+    # 3. Ограничение по загрузке (доступные часы по календарю за horizon_days календарных дней)
+    task_hours = dict(zip(tasks_df['task_id'], tasks_df['total_effort_hours']))
+    if calendar is None:
+        calendar = build_capacity_calendar(employees_df, n_calendar_days=horizon_days)
+    working_days = calendar_day_index(calendar, horizon_days)
+    for emp_data in employees_df.itertuples(index=False):
+        emp_vars = by_employee.get(emp_data.emp_id, [])
         if emp_vars:
-            emp_data = employees_df[employees_df['emp_id'] == emp_id].iloc[0]
-
-            # Расчет доступного времени (упрощенно)
-            project_duration_weeks = 8  # Предполагаем 8 недель проекта
-            available_hours = emp_data['max_hours_day'] * 5 * project_duration_weeks
+            available_hours = calculate_availability_with_vacation(calendar, emp_data.emp_id, 0, working_days)
 
-            total_hours_expr = pulp.LpAffineExpression()
-            for var in emp_vars:
-                # Находим task_id для этого назначения
-                for (t_id, e_id), v in assignments.items():
-                    if v == var and e_id == emp_id:
-                        task_hours = tasks_df[tasks_df['task_id'] == t_id]['total_effort_hours'].iloc[0]
-                        total_hours_expr += var * task_hours
-                        break
+            total_hours_expr = pulp.LpAffineExpression(
+                (var, task_hours[t_id]) for t_id, var in emp_vars
+            )
+            model += total_hours_expr <= available_hours, f"workload_{emp_data.emp_id}"
 
-            model += total_hours_expr <= available_hours, f"workload_{emp_id}"
+    return task_constraints
 
 def get_employee_info(emp_id, employees_df):
     """Возвращает информацию о сотруднике"""
@@ -586,20 +1813,20 @@ def analyze_employee_distribution(employees_df, high_visibility_tasks):
     print(f"Senior (≥5 лет): {senior_count} сотрудников")
     print(f"Задач с высокой видимостью: {len(high_visibility_tasks)}")
 
-def analyze_variant_10_results(model_base, assignments_base, model_quality, assignments_quality):
+def analyze_variant_10_results(result_base, result_quality):
     """Анализирует и сравнивает результаты двух сценариев"""
 
     # Проверяем статусы решений
-    print(f"Статус базового сценария (middle-only): {pulp.LpStatus[model_base.status]}")
-    print(f"Статус сценария качества (senior-only): {pulp.LpStatus[model_quality.status]}")
+    print(f"Статус базового сценария (middle-only): {pulp.LpStatus[result_base['status']]}")
+    print(f"Статус сценария качества (senior-only): {pulp.LpStatus[result_quality['status']]}")
 
     # Анализ задач с высокой видимостью
     high_visibility_tasks = df_project[df_project['client_visibility'] == 'Высокая']
     analyze_employee_distribution(df_employees, high_visibility_tasks)
 
-    if model_base.status == pulp.LpStatusOptimal and model_quality.status == pulp.LpStatusOptimal:
-        cost_base = pulp.value(model_base.objective)
-        cost_quality = pulp.value(model_quality.objective)
+    if result_base['status'] == pulp.LpStatusOptimal and result_quality['status'] == pulp.LpStatusOptimal:
+        cost_base = result_base['objective']
+        cost_quality = result_quality['objective']
 
         cost_difference = cost_quality - cost_base
         cost_increase_percent = (cost_difference / cost_base) * 100 if cost_base > 0 else 0
@@ -618,14 +1845,14 @@ def analyze_variant_10_results(model_base, assignments_base, model_quality, assi
 
             # Находим назначенных сотрудников в базовом сценарии (MIDDLE)
             base_emps = []
-            for (t_id, emp_id), var in assignments_base.items():
-                if t_id == task['task_id'] and pulp.value(var) > 0.5:
+            for (t_id, emp_id), value in result_base['solution'].items():
+                if t_id == task['task_id'] and value > 0.5:
                     base_emps.append(get_employee_info(emp_id, df_employees))
 
             # Находим назначенных сотрудников в сценарии качества (SENIOR)
             quality_emps = []
-            for (t_id, emp_id), var in assignments_quality.items():
-                if t_id == task['task_id'] and pulp.value(var) > 0.5:
+            for (t_id, emp_id), value in result_quality['solution'].items():
+                if t_id == task['task_id'] and value > 0.5:
                     quality_emps.append(get_employee_info(emp_id, df_employees))
 
             print(f"MIDDLE (3-4 года):")
@@ -656,58 +1883,65 @@ def analyze_variant_10_results(model_base, assignments_base, model_quality, assi
 
     else:
         print("Ошибка при решении одной из моделей")
-        if model_base.status != pulp.LpStatusOptimal:
+        if result_base['status'] != pulp.LpStatusOptimal:
             print("Проблема в базовом сценарии (middle-only)")
-        if model_quality.status != pulp.LpStatusOptimal:
+        if result_quality['status'] != pulp.LpStatusOptimal:
             print("Проблема в сценарии качества (senior-only)")
 
 # Проверка данных
-print("ПРОВЕРКА ДАННЫХ:")
-print(f"Задач: {len(df_project)}")
-print(f"Сотрудников: {len(df_employees)}")
-print(f"Задач с client_visibility='Высокая': {len(df_project[df_project['client_visibility'] == 'Высокая'])}")
-
-# Статистика по опыту сотрудников
-junior_count = len(df_employees[df_employees['experience'] < 3])
-middle_count = len(df_employees[(df_employees['experience'] >= 3) & (df_employees['experience'] <= 4)])
-senior_count = len(df_employees[df_employees['experience'] >= 5])
-
-print(f"Junior-разработчиков (<3 лет): {junior_count}")
-print(f"Middle-разработчиков (3-4 года): {middle_count}")
-print(f"Senior-разработчиков (≥5 лет): {senior_count}")
-
-# Проверка доступности middle-разработчиков для задач с высокой видимостью
-high_visibility_tasks = df_project[df_project['client_visibility'] == 'Высокая']
-print(f"\nПРОВЕРКА ДОСТУПНОСТИ MIDDLE-РАЗРАБОТЧИКОВ:")
-
-for _, task in high_visibility_tasks.iterrows():
-    middle_emps = df_employees[
-        (df_employees['experience'] >= 3) &
-        (df_employees['experience'] <= 4) &
-        (
-            (df_employees['primary_skill'] == task['skill_1']) |
-            (df_employees['secondary_skill'] == task['skill_1']) |
-            (df_employees['primary_skill'] == task['skill_2']) |
-            (df_employees['secondary_skill'] == task['skill_2'])
-        ) &
-        (df_employees['skill_level'] >= 7) &
-        (df_employees['security_clear'] >= task['min_security'])
-    ]
-    print(f"{task['task_name']}: {len(middle_emps)} подходящих middle-разработчиков")
+if RUN_NOTEBOOK:
+    print("ПРОВЕРКА ДАННЫХ:")
+    print(f"Задач: {len(df_project)}")
+    print(f"Сотрудников: {len(df_employees)}")
+    print(f"Задач с client_visibility='Высокая': {len(df_project[df_project['client_visibility'] == 'Высокая'])}")
+
+    # Статистика по опыту сотрудников
+    junior_count = len(df_employees[df_employees['experience'] < 3])
+    middle_count = len(df_employees[(df_employees['experience'] >= 3) & (df_employees['experience'] <= 4)])
+    senior_count = len(df_employees[df_employees['experience'] >= 5])
+
+    print(f"Junior-разработчиков (<3 лет): {junior_count}")
+    print(f"Middle-разработчиков (3-4 года): {middle_count}")
+    print(f"Senior-разработчиков (≥5 лет): {senior_count}")
+
+    # Проверка доступности middle-разработчиков для задач с высокой видимостью
+    high_visibility_tasks = df_project[df_project['client_visibility'] == 'Высокая']
+    print(f"\nПРОВЕРКА ДОСТУПНОСТИ MIDDLE-РАЗРАБОТЧИКОВ:")
+
+    for _, task in high_visibility_tasks.iterrows():
+        middle_emps = df_employees[
+            (df_employees['experience'] >= 3) &
+            (df_employees['experience'] <= 4) &
+            (
+                (df_employees['primary_skill'] == task['skill_1']) |
+                (df_employees['secondary_skill'] == task['skill_1']) |
+                (df_employees['primary_skill'] == task['skill_2']) |
+                (df_employees['secondary_skill'] == task['skill_2'])
+            ) &
+            (df_employees['skill_level'] >= 7) &
+            (df_employees['security_clear'] >= task['min_security'])
+        ]
+        print(f"{task['task_name']}: {len(middle_emps)} подходящих middle-разработчиков")
 
-# Запуск решения
-try:
-    print(f"\nРЕШЕНИЕ ЗАДАЧ ОПТИМИЗАЦИИ...")
-    model_base, assignments_base = solve_variant_10_base_scenario()
-    model_quality, assignments_quality = solve_variant_10_quality_scenario()
+    # Запуск решения
+    try:
+        print(f"\nРЕШЕНИЕ ЗАДАЧ ОПТИМИЗАЦИИ...")
+        # Общая модель строится один раз, сценарии меняют только границы переменных
+        scenario_model = build_scenario_model(df_project, df_employees, "Variant10_Scenarios", calendar=capacity_calendar,
+                                              co_location_tasks=index_co_location_tasks(df_limitations))
+        print(f"Создано {len(scenario_model['assignments'])} переменных общей модели сценариев")
+
+        # Сценарии независимы и решаются параллельно
+        results = solve_scenarios_parallel(scenario_model, [VARIANT_10_BASE, VARIANT_10_QUALITY])
+        result_base, result_quality = results['base'], results['quality']
 
-    # Анализ результатов
-    analyze_variant_10_results(model_base, assignments_base, model_quality, assignments_quality)
+        # Анализ результатов
+        analyze_variant_10_results(result_base, result_quality)
 
-except Exception as e:
-    print(f"Ошибка при выполнении: {e}")
-    import traceback
-    traceback.print_exc()
+    except Exception as e:
+        print(f"Ошибка при выполнении: {e}")
+        import traceback
+        traceback.print_exc()
 
 # %% [markdown] id="4sYlOOC2t-u3"
 # # Задание 3
@@ -716,23 +1950,391 @@ except Exception as e:
 # %% id="3Ecit46ZA_Ha" colab={"base_uri": "https://localhost:8080/"} outputId="b4cc8b17-17cb-4a5a-c34a-66f780e67672"
 import pandas as pd
 import numpy as np
+import plotly
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import plotly.express as px
+import plotly.io as pio
+from plotly.offline import get_plotlyjs
 import networkx as nx
 from scipy import stats
 from datetime import datetime, timedelta
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import argparse
+import contextlib
+import hashlib
+import heapq
+import html
+import io
+import json
+import os
+import platform
+import tempfile
+import time
 import warnings
 warnings.filterwarnings('ignore')
 
+# Диаграмма Ганта: подписи задач - до 'labels' задач, столбцы - до 'bars',
+# отрезки WebGL - до 'webgl', для более крупных проектов - агрегированная тепловая карта
+GANTT_MODE_LIMITS = {'labels': 200, 'bars': 2000, 'webgl': 50000}
+
+# Экспорт дашборда: общий plotly.js рядом с HTML-файлами и предел точек для плотных рядов
+SHARED_PLOTLYJS = 'plotly.min.js'
+DASHBOARD_MAX_POINTS = 500
+
+# Расчет CPM на массивах: граф зависимостей хранится как CSR (indptr, successors),
+# прямой и обратный проходы выполняются по уровням топологического порядка.
+def build_csr_adjacency(n_nodes, src, dst):
+    """CSR-представление графа: последователи узла i - successors[indptr[i]:indptr[i + 1]]"""
+    order = np.argsort(src, kind='stable')
+    indptr = np.zeros(n_nodes + 1, dtype=np.int64)
+    np.cumsum(np.bincount(src, minlength=n_nodes), out=indptr[1:])
+    return indptr, dst[order]
+
+def topological_levels(n_nodes, src, dst):
+    """Уровни узлов по алгоритму Кана (все узлы уровня обрабатываются одной операцией)"""
+    indptr, successors = build_csr_adjacency(n_nodes, src, dst)
+    indegree = np.bincount(dst, minlength=n_nodes)
+    level = np.full(n_nodes, -1, dtype=np.int64)
+    frontier = np.flatnonzero(indegree == 0)
+    current = 0
+    while frontier.size:
+        level[frontier] = current
+        starts = indptr[frontier]
+        counts = indptr[frontier + 1] - starts
+        total = counts.sum()
+        if total == 0:
+            break
+        # Индексы всех исходящих ребер фронта без цикла по узлам
+        edge_idx = np.arange(total) + np.repeat(starts - (np.cumsum(counts) - counts), counts)
+        reached = successors[edge_idx]
+        np.subtract.at(indegree, reached, 1)
+        frontier = reached[indegree[reached] == 0]
+        if frontier.size > 1:
+            frontier = np.unique(frontier)
+        current += 1
+    if (level < 0).any():
+        raise ValueError("Граф зависимостей содержит цикл")
+    return level
+
+def prepare_cpm_structure(n_nodes, src, dst):
+    """Предрасчет структуры графа для CPM: сжатие цепочек и уровни сжатого графа.
+    Зависит только от зависимостей, поэтому считается один раз для любых длительностей."""
+    src = np.asarray(src, dtype=np.int64)
+    dst = np.asarray(dst, dtype=np.int64)
+
+    # 1. Поиск цепочек: ребро u->v цепное, если у u один последователь, а у v один предшественник
+    outdegree = np.bincount(src, minlength=n_nodes)
+    indegree = np.bincount(dst, minlength=n_nodes)
+    chain = (outdegree[src] == 1) & (indegree[dst] == 1)
+    prev = np.full(n_nodes, -1, dtype=np.int64)
+    prev[dst[chain]] = src[chain]
+
+    # 2. Голова цепочки и позиция узла в ней (pointer jumping за log(n) шагов)
+    head = np.where(prev >= 0, prev, np.arange(n_nodes))
+    rank = (prev >= 0).astype(np.int64)
+    while True:
+        next_head = head[head]
+        if np.array_equal(next_head, head):
+            break
+        rank = rank + rank[head]
+        head = next_head
+
+    order = np.lexsort((rank, head))
+    heads, first = np.unique(head[order], return_index=True)
+    chain_id = np.searchsorted(heads, head)
+
+    # 3. Уровни сжатого графа и ребра, разбитые на раунды для прямого и обратного прохода
+    chain_src, chain_dst = chain_id[src[~chain]], chain_id[dst[~chain]]
+    level = topological_levels(len(heads), chain_src, chain_dst)
+    n_levels = level.max() + 1 if len(heads) else 0
+    bounds = np.arange(n_levels + 1)
+    node_order = np.argsort(level, kind='stable')
+
+    return {
+        'n_nodes': n_nodes, 'src': src, 'dst': dst,
+        'order': order, 'first': first, 'group': np.searchsorted(heads, head[order]), 'chain_id': chain_id,
+        'n_levels': n_levels,
+        'node_order': node_order, 'node_ptr': np.searchsorted(level[node_order], bounds),
+        'fwd_rounds': _edge_rounds(chain_dst, chain_src, level[chain_src], n_levels),
+        'bwd_rounds': _edge_rounds(chain_src, chain_dst, level[chain_dst], n_levels),
+    }
+
+def _edge_rounds(targets, sources, edge_level, n_levels):
+    """Ребра каждого уровня, разбитые на раунды без повторов обновляемого узла (targets):
+    в раунде k - k-е ребро каждого узла, поэтому обновление по раунду - обычное присваивание
+    вместо медленного ufunc.at на матрицах. Возвращает [[(targets, sources), ...] по уровням]."""
+    order = np.lexsort((targets, edge_level))
+    targets, sources, edge_level = targets[order], sources[order], edge_level[order]
+    new_group = (np.diff(edge_level, prepend=-1) != 0) | (np.diff(targets, prepend=-1) != 0)
+    positions = np.arange(len(targets))
+    rank = positions - np.maximum.accumulate(np.where(new_group, positions, 0))
+
+    rounds = [[] for _ in range(n_levels)]
+    order = np.lexsort((rank, edge_level))
+    keys = edge_level[order] * (rank.max(initial=0) + 1) + rank[order]
+    starts = np.flatnonzero(np.diff(keys, prepend=-1))
+    for start, end in zip(starts, np.append(starts[1:], len(keys))):
+        segment = order[start:end]
+        rounds[edge_level[segment[0]]].append((targets[segment], sources[segment]))
+    return rounds
+
+def _cpm_forward_pass(structure, durations):
+    """Прямой проход CPM по уровням сжатого графа: ES = max(EF предшественников)
+    (durations: узлы x выборки). Возвращает ES и EF узлов."""
+    node_order, node_ptr = structure['node_order'], structure['node_ptr']
+    early_start = np.zeros_like(durations)
+    early_finish = np.zeros_like(durations)
+    for lvl in range(structure['n_levels']):
+        nodes = node_order[node_ptr[lvl]:node_ptr[lvl + 1]]
+        early_finish[nodes] = early_start[nodes] + durations[nodes]
+        for targets, sources in structure['fwd_rounds'][lvl]:
+            early_start[targets] = np.maximum(early_start[targets], early_finish[sources])
+    return early_start, early_finish
+
+def _cpm_backward_pass(structure, durations, project_duration):
+    """Обратный проход CPM по уровням сжатого графа: LF = min(LS последователей)"""
+    node_order, node_ptr = structure['node_order'], structure['node_ptr']
+    late_finish = np.broadcast_to(project_duration, durations.shape).copy()
+    late_start = np.zeros_like(durations)
+    for lvl in range(structure['n_levels'] - 1, -1, -1):
+        nodes = node_order[node_ptr[lvl]:node_ptr[lvl + 1]]
+        late_start[nodes] = late_finish[nodes] - durations[nodes]
+        for targets, sources in structure['bwd_rounds'][lvl]:
+            late_finish[targets] = np.minimum(late_finish[targets], late_start[sources])
+    return late_finish
+
+def _chain_durations(structure, sorted_durations):
+    """Суммарные длительности цепочек (sorted_durations - длительности в порядке structure['order']).
+    Складываются k-е задачи всех цепочек длиннее k: reduceat и cumsum по строкам матрицы медленнее."""
+    first = structure['first']
+    lengths = np.diff(np.append(first, len(sorted_durations)))
+    chain_duration = sorted_durations[first]
+    for k in range(1, lengths.max(initial=0)):
+        chains = np.flatnonzero(lengths > k)
+        chain_duration[chains] += sorted_durations[first[chains] + k]
+    return chain_duration
+
+def evaluate_cpm(structure, durations):
+    """CPM для одной (задачи) или сразу многих (задачи x выборки) матриц длительностей"""
+    durations = np.asarray(durations, dtype=float)
+    single = durations.ndim == 1
+    if single:
+        durations = durations[:, None]
+    order, first, group, chain_id = structure['order'], structure['first'], structure['group'], structure['chain_id']
+    src, dst = structure['src'], structure['dst']
+    n_nodes, n_samples = durations.shape
+
+    # Смещение задачи от начала цепочки и суммарная длительность цепочки
+    sorted_durations = durations[order]
+    cumulative = np.concatenate([np.zeros((1, n_samples)), np.cumsum(sorted_durations, axis=0)])
+    offset = np.empty_like(durations)
+    offset[order] = cumulative[1:] - sorted_durations - cumulative[first][group]
+    chain_duration = _chain_durations(structure, sorted_durations)
+
+    # CPM на сжатом графе и развертывание обратно по задачам
+    chain_es, chain_ef = _cpm_forward_pass(structure, chain_duration)
+    chain_lf = _cpm_backward_pass(structure, chain_duration,
+                                  chain_ef.max(axis=0) if len(chain_ef) else np.zeros(n_samples))
+    early_start = chain_es[chain_id] + offset
+    early_finish = early_start + durations
+    late_finish = chain_lf[chain_id] - (chain_duration[chain_id] - offset - durations)
+    late_start = late_finish - durations
+    project_duration = early_finish.max(axis=0) if n_nodes else np.zeros(n_samples)
+
+    # Свободный резерв: min(ES последователей) - EF, для конечных задач - до конца проекта
+    min_successor_start = np.broadcast_to(project_duration, durations.shape).copy()
+    np.minimum.at(min_successor_start, src, early_start[dst])
+
+    result = {
+        'ES': early_start,
+        'EF': early_finish,
+        'LS': late_start,
+        'LF': late_finish,
+        'Float': late_start - early_start,
+        'Free_Float': np.maximum(0, min_successor_start - early_finish),
+    }
+    if single:
+        result = {column: values[:, 0] for column, values in result.items()}
+    return result
+
+def compute_cpm(durations, src, dst):
+    """CPM на массивах: ES, EF, LS, LF, полный и свободный резерв в порядке задач
+
+    Цепочки задач (один предшественник и один последователь) сначала сжимаются
+    в один узел, поэтому длинные последовательности не увеличивают число уровней.
+    """
+    return evaluate_cpm(prepare_cpm_structure(len(durations), src, dst), durations)
+
+def sample_task_durations(optimistic, likely, pessimistic, n_samples, rng, distribution='beta_pert'):
+    """Выборка длительностей задач (задачи x выборки) из Beta-PERT или треугольного распределения"""
+    low = np.asarray(optimistic, dtype=float)[:, None]
+    mode = np.asarray(likely, dtype=float)[:, None]
+    high = np.asarray(pessimistic, dtype=float)[:, None]
+    span = high - low
+    safe_span = np.where(span > 0, span, 1.0)
+    shape = (len(low), n_samples)
+
+    if distribution == 'beta_pert':
+        alpha = 1 + 4 * (mode - low) / safe_span
+        beta = 1 + 4 * (high - mode) / safe_span
+        return low + span * rng.beta(np.broadcast_to(alpha, shape), np.broadcast_to(beta, shape))
+    if distribution == 'triangular':
+        # Обратная функция распределения (работает и для вырожденных оценок low == high)
+        u = rng.random(shape)
+        mode_share = (mode - low) / safe_span
+        left = low + np.sqrt(u * span * (mode - low))
+        right = high - np.sqrt((1 - u) * span * (high - mode))
+        return np.where(u < mode_share, left, right)
+    raise ValueError(f"Неизвестное распределение: {distribution}")
+
+MC_BLOCK_SIZE = 1024  # выборок Монте-Карло на один поток случайных чисел
+
+def _block_seed(seed, block):
+    """SeedSequence блока выборок: потомок seed с номером block (как SeedSequence.spawn,
+    но без изменения счетчика seed, поэтому повторный вызов дает тот же поток)"""
+    return np.random.SeedSequence(seed.entropy, spawn_key=seed.spawn_key + (block,), pool_size=seed.pool_size)
+
+def simulate_completion_batch(structure, estimates, n_samples, seed, distribution='beta_pert',
+                              memory_limit_mb=256, criticality=True, first_block=0):
+    """Одна серия Монте-Карло: сроки проекта и число выборок, в которых задача критична.
+    estimates - (optimistic, likely, pessimistic); seed - число или SeedSequence.
+    Выборки идут блоками по MC_BLOCK_SIZE со своим потоком случайных чисел (блок
+    first_block + k), поэтому результат не зависит от memory_limit_mb и разбиения на серии,
+    а одинаковый seed дает побитово одинаковый результат. При criticality=False
+    считается только прямой проход CPM, вместо числа критичных выборок - None."""
+    n_tasks = len(estimates[0])
+    seed = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+    # ~4 матрицы задачи x выборки в памяти одновременно, часть - целое число блоков (хотя бы один)
+    chunk_size = max(1, int(memory_limit_mb * 2**20 / (4 * 8 * max(n_tasks, 1))) // MC_BLOCK_SIZE) * MC_BLOCK_SIZE
+    order, chain_id = structure['order'], structure['chain_id']
+    sorted_estimates = [np.asarray(values, dtype=float)[order] for values in estimates]
+    completion_times = np.empty(n_samples)
+    critical_counts = np.zeros(n_tasks) if criticality else None
+    for start in range(0, n_samples, chunk_size):
+        size = min(chunk_size, n_samples - start)
+        # Сразу в порядке цепочек: для сроков нужны только суммарные длительности цепочек
+        sorted_durations = np.empty((n_tasks, size))
+        for block_start in range(0, size, MC_BLOCK_SIZE):
+            block_size = min(MC_BLOCK_SIZE, size - block_start)
+            rng = np.random.default_rng(_block_seed(seed, first_block + (start + block_start) // MC_BLOCK_SIZE))
+            sorted_durations[:, block_start:block_start + block_size] = sample_task_durations(
+                *sorted_estimates, block_size, rng, distribution)
+        chain_duration = _chain_durations(structure, sorted_durations)
+        chain_es, chain_ef = _cpm_forward_pass(structure, chain_duration)
+        finish = chain_ef.max(axis=0) if len(chain_ef) else np.zeros(size)
+        completion_times[start:start + size] = finish
+        if criticality:
+            # Полный резерв одинаков у всех задач цепочки: LS - ES = LF - длительность - ES цепочки
+            chain_float = _cpm_backward_pass(structure, chain_duration, finish) - chain_duration - chain_es
+            critical_counts += (np.abs(chain_float) < 0.001).sum(axis=1)[chain_id]
+    return completion_times, critical_counts
+
+def _simulate_completion_batch_in_worker(batch_index, structure, estimates, n_samples, seed,
+                                         distribution, memory_limit_mb, criticality, first_block):
+    completion_times, critical_counts = simulate_completion_batch(
+        structure, estimates, n_samples, seed, distribution, memory_limit_mb, criticality, first_block)
+    return batch_index, completion_times, critical_counts
+
+def histogram_percentiles(counts, bin_edges, percentiles=(50, 80, 95)):
+    """Приближенные перцентили по гистограмме (линейная интерполяция внутри корзины)"""
+    cumulative = np.concatenate([[0], np.cumsum(counts)]) / max(counts.sum(), 1)
+    return {f"P{p}": float(np.interp(p / 100, cumulative, bin_edges)) for p in percentiles}
+
+def daily_load_profile(start_days, end_days, amounts, n_days, rows=None, n_rows=1):
+    """Нагрузка по дням разностным массивом: объем работ распределяется поровну на дни
+    start..end включительно, O(задачи + дни). При заданных rows - матрица n_rows x n_days."""
+    start_days = np.asarray(start_days, dtype=np.int64)
+    end_days = np.asarray(end_days, dtype=np.int64)
+    daily_amount = np.asarray(amounts, dtype=float) / (end_days - start_days + 1)
+    rows = np.zeros(len(start_days), dtype=np.int64) if rows is None else np.asarray(rows, dtype=np.int64)
+
+    difference = np.zeros((n_rows, n_days + 1))
+    np.add.at(difference, (rows, start_days), daily_amount)
+    np.add.at(difference, (rows, end_days + 1), -daily_amount)
+    return np.cumsum(difference[:, :n_days], axis=1)
+
+def serial_schedule_generation(durations, priority, src, dst, task_resources, daily_rates, capacity, nominal=None):
+    """Последовательная схема генерации расписания (serial SGS) с ограничением ресурсов
+
+    Из готовых к планированию задач (все предшественники размещены) берется задача с
+    наименьшим приоритетом (кортеж, например (LS, ES)) и ставится на самый ранний день,
+    начиная с которого все ее ресурсы свободны durations[i] дней подряд.
+    task_resources[i] - индексы ресурсов задачи, daily_rates[i] - часы в день на каждый ресурс,
+    capacity[r] - часы в день ресурса r или матрица ресурсы x дни (календарь), nominal[r] -
+    часы в день после конца календаря (по умолчанию - максимальная емкость ресурса в нем).
+    Возвращает дни начала задач; ValueError, если задаче не хватает емкости и после календаря.
+    """
+    n_tasks = len(durations)
+    indptr, successors = build_csr_adjacency(n_tasks, np.asarray(src, dtype=np.int64), np.asarray(dst, dtype=np.int64))
+    remaining = np.bincount(np.asarray(dst, dtype=np.int64), minlength=n_tasks)
+    ready_day = np.zeros(n_tasks, dtype=np.int64)
+    start = np.full(n_tasks, -1, dtype=np.int64)
+
+    capacity = np.asarray(capacity, dtype=float)
+    if capacity.ndim == 1:
+        capacity = capacity[:, None]
+    nominal = capacity.max(axis=1, initial=0) if nominal is None else np.asarray(nominal, dtype=float)
+    # После конца календаря емкость постоянна: задача, не влезающая в nominal, не встанет никогда
+    never_fits = [i for i in range(n_tasks) if durations[i] > 0 and len(task_resources[i])
+                  and daily_rates[i] > nominal[task_resources[i]].min() + 1e-9]
+    if never_fits:
+        raise ValueError(f"Задачам не хватает емкости ресурсов ни в один день: позиции {never_fits}")
+    nominal = nominal[:, None]
+
+    def extend(usage, available, width):
+        """Расширяет матрицы занятости и емкости до width дней"""
+        known = capacity[:, usage.shape[1]:width]
+        extra = np.hstack([known, np.repeat(nominal, width - usage.shape[1] - known.shape[1], axis=1)])
+        return np.pad(usage, ((0, 0), (0, width - usage.shape[1]))), np.hstack([available, extra])
+
+    horizon = max(1, int(np.sum(durations)) // max(len(capacity), 1) + int(np.max(durations, initial=0)) + 1)
+    usage, available = extend(np.zeros((len(capacity), 0)), np.zeros((len(capacity), 0)), horizon)
+    heap = [(priority[i], i) for i in np.flatnonzero(remaining == 0)]
+    heapq.heapify(heap)
+
+    while heap:
+        _, i = heapq.heappop(heap)
+        day, length, resources = ready_day[i], durations[i], task_resources[i]
+        if len(resources) and length > 0:
+            while True:
+                if day + length > usage.shape[1]:
+                    usage, available = extend(usage, available, usage.shape[1] + max(usage.shape[1], day + length))
+                # Ищем первый свободный отрезок длины length среди занятых дней после day
+                busy = ~(usage[resources, day:] + daily_rates[i] <= available[resources, day:] + 1e-9).all(axis=0)
+                blocked = np.concatenate([[-1], np.flatnonzero(busy), [len(busy)]])
+                fits = np.flatnonzero(np.diff(blocked) - 1 >= length)
+                if fits.size:
+                    day = day + blocked[fits[0]] + 1
+                    break
+                day = day + blocked[-2] + 1
+            usage[resources, day:day + length] += daily_rates[i]
+        start[i] = day
+
+        finish = day + length
+        for j in successors[indptr[i]:indptr[i + 1]]:
+            ready_day[j] = max(ready_day[j], finish)
+            remaining[j] -= 1
+            if remaining[j] == 0:
+                heapq.heappush(heap, (priority[j], j))
+
+    if (start < 0).any():
+        raise ValueError("Граф зависимостей содержит цикл")
+    return start
+
 class ProjectGanttDashboard:
     """Класс для создания комплексного дашборда проекта"""
 
-    def __init__(self, tasks_df, employees_df):
+    def __init__(self, tasks_df, employees_df, calendar=None, cache=None):
         self.tasks_df = tasks_df.copy()
         self.employees_df = employees_df.copy()
+        self.cache = cache  # ResultCache для таблицы CPM (None - без кэша)
+        # Дни проекта в дашборде - рабочие дни календаря доступности
+        self.calendar = calendar if calendar is not None else build_capacity_calendar(self.employees_df)
         self.critical_path = []
         self.project_duration = 0
+        self.mc_completion_times = None  # сроки последней симуляции Монте-Карло
+        self._completion_stats = {}
         self.prepare_data()
 
     def prepare_data(self):
@@ -749,119 +2351,57 @@ class ProjectGanttDashboard:
         self.tasks_df['pert_std'] = (
             self.tasks_df['pessimistic_days'] - self.tasks_df['optimistic_days']
         ) / 6
+        self.invalidate_completion_stats()
 
         print("Данные подготовлены. Расчет PERT завершен.")
 
-    def calculate_critical_path(self):
-        """Расчет критического пути и временных параметров (Задание 1.1, 3.1)"""
-        G = nx.DiGraph()
-
-        # Добавляем узлы (задачи)
-        for _, task in self.tasks_df.iterrows():
-            G.add_node(
-                task['task_id'],
-                duration=task['pert_duration'],
-                name=task['task_name']
-            )
+    def build_dependency_edges(self):
+        """Зависимости между задачами в виде массивов позиций (src -> dst) в tasks_df"""
+        n_tasks = len(self.tasks_df)
 
         # СОЗДАЕМ РЕАЛИСТИЧНЫЕ ЗАВИСИМОСТИ МЕЖДУ ЗАДАЧАМИ
-        # Группируем задачи по типам для создания параллельных веток
-        task_types = {}
-        for _, task in self.tasks_df.iterrows():
-            task_type = task.get('task_type', 'development')  # Используем существующий тип или задаем по умолчанию
-            if task_type not in task_types:
-                task_types[task_type] = []
-            task_types[task_type].append(task['task_id'])
-
-        # Создаем зависимости внутри каждой группы (параллельные задачи)
-        for task_type, tasks in task_types.items():
-            for i in range(len(tasks) - 1):
-                G.add_edge(tasks[i], tasks[i + 1])
-
-        # Создаем кросс-зависимости между группами (пересекающиеся задачи)
-        task_ids = self.tasks_df['task_id'].tolist()
-        if len(task_ids) >= 4:
-            # Пример: задача 3 зависит от задач 1 и 2 (параллельное выполнение)
-            G.add_edge(task_ids[0], task_ids[2])
-            G.add_edge(task_ids[1], task_ids[2])
-            # Пример: задачи 4 и 5 выполняются параллельно после задачи 3
-            G.add_edge(task_ids[2], task_ids[3])
-            G.add_edge(task_ids[2], task_ids[4])
-
-        # Расчет ранних сроков (Forward Pass)
-        early_start, early_finish = {}, {}
-        # Добавляем фиктивный начальный узел
-        G.add_node('start', duration=0)
-        for node in G.nodes():
-            if node != 'start' and len(list(G.predecessors(node))) == 0:
-                G.add_edge('start', node)
-
-        topo_order = list(nx.topological_sort(G))
-        topo_order = [node for node in topo_order if node != 'start']
-
-        for node in topo_order:
-            predecessors = list(G.predecessors(node))
-            if not predecessors or (len(predecessors) == 1 and predecessors[0] == 'start'):
-                early_start[node] = 0
-            else:
-                early_start[node] = max(early_finish[pred] for pred in predecessors if pred != 'start')
-            early_finish[node] = early_start[node] + G.nodes[node]['duration']
-
-        # Расчет поздних сроков (Backward Pass)
-        self.project_duration = max(early_finish.values())
-        late_finish, late_start = {}, {}
-
-        # Добавляем фиктивный конечный узел
-        G.add_node('end', duration=0)
-        for node in G.nodes():
-            if node != 'end' and len(list(G.successors(node))) == 0:
-                G.add_edge(node, 'end')
-
-        reverse_topo = list(reversed(list(nx.topological_sort(G))))
-        reverse_topo = [node for node in reverse_topo if node not in ['start', 'end']]
-
-        for node in reverse_topo:
-            successors = list(G.successors(node))
-            if not successors or (len(successors) == 1 and successors[0] == 'end'):
-                late_finish[node] = self.project_duration
-            else:
-                late_finish[node] = min(late_start[succ] for succ in successors if succ != 'end')
-            late_start[node] = late_finish[node] - G.nodes[node]['duration']
-
-        # Расчет резервов и идентификация критического пути
-        results = []
-        for node in G.nodes():
-            if node in ['start', 'end']:
-                continue
-
-            total_float = late_start[node] - early_start[node]
-            free_float = 0
-            if list(G.successors(node)):
-                successors = [succ for succ in G.successors(node) if succ != 'end']
-                if successors:
-                    free_float = min(early_start[succ] for succ in successors) - early_finish[node]
-                else:
-                    free_float = self.project_duration - early_finish[node]
-            else:
-                free_float = self.project_duration - early_finish[node]
-
-            is_critical = abs(total_float) < 0.001
-
-            if is_critical:
-                self.critical_path.append(node)
-
-            results.append({
-                'task_id': node,
-                'ES': early_start[node],
-                'EF': early_finish[node],
-                'LS': late_start[node],
-                'LF': late_finish[node],
-                'Float': total_float,
-                'Free_Float': max(0, free_float),
-                'is_critical': is_critical
-            })
+        # Задачи одного типа выполняются последовательно (параллельные ветки по типам)
+        if 'task_type' in self.tasks_df.columns:
+            task_types, _ = pd.factorize(self.tasks_df['task_type'], use_na_sentinel=False)
+        else:
+            task_types = np.zeros(n_tasks, dtype=np.int64)  # Все задачи - development
+        order = np.argsort(task_types, kind='stable')
+        same_type = task_types[order[1:]] == task_types[order[:-1]]
+        src, dst = order[:-1][same_type], order[1:][same_type]
+
+        # Кросс-зависимости между группами (пересекающиеся задачи):
+        # задача 3 зависит от задач 1 и 2, задачи 4 и 5 выполняются параллельно после задачи 3
+        if n_tasks >= 4:
+            cross = np.array([(0, 2), (1, 2), (2, 3), (2, 4)])
+            cross = cross[cross[:, 1] < n_tasks]
+            src = np.concatenate([src, cross[:, 0]])
+            dst = np.concatenate([dst, cross[:, 1]])
+
+        # Убираем повторяющиеся ребра
+        edges = np.unique(src.astype(np.int64) * n_tasks + dst)
+        return edges // max(n_tasks, 1), edges % max(n_tasks, 1)
 
-        self.tasks_df = pd.merge(self.tasks_df, pd.DataFrame(results), on='task_id')
+    def calculate_critical_path(self):
+        """Расчет критического пути и временных параметров (Задание 1.1, 3.1)"""
+        src, dst = self.build_dependency_edges()
+        durations = self.tasks_df['pert_duration'].to_numpy(dtype=float)
+        key = self.cache.key('cpm', durations, src, dst) if self.cache else None
+        cpm = self.cache.get(key) if self.cache else None
+        if cpm is None:
+            cpm = compute_cpm(durations, src, dst)
+            if self.cache:
+                self.cache.put(key, cpm)
+
+        for column, values in cpm.items():
+            self.tasks_df[column] = values
+        self.tasks_df['is_critical'] = np.abs(cpm['Float']) < 0.001
+        self.project_duration = cpm['EF'].max() if len(cpm['EF']) else 0
+        self.critical_path = self.tasks_df.loc[self.tasks_df['is_critical'], 'task_id'].tolist()
+        self.invalidate_completion_stats()
+
+        # Зависимости храним по task_id: порядок строк tasks_df потом меняется
+        task_ids = self.tasks_df['task_id'].to_numpy()
+        self.dependency_edges = (task_ids[src], task_ids[dst])
 
         print(f"Критический путь рассчитан. Длительность проекта: {self.project_duration:.1f} дней")
         print(f"Критические задачи: {len(self.critical_path)}")
@@ -869,13 +2409,15 @@ class ProjectGanttDashboard:
 
         # Выводим информацию о пересекающихся задачах
         print("\nСТРУКТУРА ПРОЕКТА:")
-        for i, task in self.tasks_df.iterrows():
-            predecessors = list(G.predecessors(task['task_id']))
-            predecessors = [p for p in predecessors if p != 'start']
-            print(f"   {task['task_name']}: ES={task['ES']:.0f}, EF={task['EF']:.0f}, резерв={task['Float']:.1f}д")
+        for name, es, ef, total_float in zip(self.tasks_df['task_name'], self.tasks_df['ES'],
+                                             self.tasks_df['EF'], self.tasks_df['Float']):
+            print(f"   {name}: ES={es:.0f}, EF={ef:.0f}, резерв={total_float:.1f}д")
+
+    def create_comprehensive_dashboard(self, gantt_mode='auto'):
+        """Создание комплексного дашборда (Все задания в одном)
 
-    def create_comprehensive_dashboard(self):
-        """Создание комплексного дашборда (Все задания в одном)"""
+        gantt_mode - режим диаграммы Ганта (см. add_gantt_traces)
+        """
 
         # Создаем дашборд с 8 графиками
         fig = make_subplots(
@@ -912,88 +2454,8 @@ class ProjectGanttDashboard:
             'deployment': '#32CD32'     # Лаймовый для деплоя
         }
 
-        # Группируем задачи по типам для лучшей визуализации
-        task_categories = {}
-        for _, task in self.tasks_df.iterrows():
-            # Используем существующий тип задачи или определяем по названию
-            task_type = task.get('task_type', 'development')
-            if 'анализ' in task['task_name'].lower() or 'аналитик' in task['task_name'].lower():
-                task_type = 'analysis'
-            elif 'тест' in task['task_name'].lower() or 'проверк' in task['task_name'].lower():
-                task_type = 'testing'
-            elif 'внедр' in task['task_name'].lower() or 'деплой' in task['task_name'].lower():
-                task_type = 'deployment'
-
-            if task_type not in task_categories:
-                task_categories[task_type] = []
-            task_categories[task_type].append(task)
-
-        # Сортируем задачи по времени начала для лучшего отображения
-        self.tasks_df = self.tasks_df.sort_values('ES')
-
-        # Добавляем ВСЕ задачи проекта с разными цветами по типам
-        y_positions = {}  # Для отслеживания позиций на оси Y
-        current_y = 0
-
-        for task_type, tasks in task_categories.items():
-            for task in tasks:
-                is_critical = task['is_critical']
-
-                # Выбираем цвет в зависимости от типа задачи и критичности
-                if is_critical:
-                    color = colors['critical']
-                else:
-                    color = colors.get(task_type, colors['normal'])
-
-                # Определяем позицию на оси Y
-                y_position = f"{task_type}_{current_y}"
-                y_positions[task['task_id']] = current_y
-
-                fig.add_trace(go.Bar(
-                    name=task['task_name'],
-                    x=[task['pert_duration']],
-                    y=[current_y],
-                    base=task['ES'],
-                    orientation='h',
-                    marker_color=color,
-                    marker_line=dict(width=2, color='darkgray'),
-                    text=[f"{task['pert_duration']}д"],
-                    textposition='inside',
-                    textfont=dict(color='white' if is_critical else 'black', size=9),
-                    hovertemplate=(
-                        f"<b>{task['task_name']}</b><br>"
-                        f"Тип: {task_type.upper()}<br>"
-                        f"Категория: {'🚨 КРИТИЧЕСКАЯ' if is_critical else '✅ Обычная'}<br>"
-                        f"Длительность: {task['pert_duration']} дней<br>"
-                        f"Период: {task['ES']:.0f}-{task['EF']:.0f} дней<br>"
-                        f"Резерв: {task['Float']:.1f} дней<br>"
-                        f"<extra></extra>"
-                    ),
-                    showlegend=False
-                ), row=1, col=1)
-
-                current_y += 1
-
-        # Добавляем вехи
-        milestones = [
-            {'name': 'Старт проекта', 'day': 0},
-            {'name': 'Завершение проектирования', 'day': self.project_duration * 0.3},
-            {'name': 'Готовность прототипа', 'day': self.project_duration * 0.6},
-            {'name': 'Финальное тестирование', 'day': self.project_duration * 0.85},
-            {'name': 'Сдача проекта', 'day': self.project_duration}
-        ]
-
-        for milestone in milestones:
-            # Вертикальные линии вех
-            fig.add_trace(go.Scatter(
-                x=[milestone['day'], milestone['day']],
-                y=[-1, current_y],
-                mode='lines',
-                line=dict(color=colors['milestone'], width=3, dash='dot'),
-                name=f'Веха: {milestone["name"]}',
-                hovertemplate=f"<b>Веха: {milestone['name']}</b><br>День: {milestone['day']:.0f}<extra></extra>",
-                showlegend=False
-            ), row=1, col=1)
+        # Все задачи рисуются несколькими групповыми трассами (критические / по типам)
+        gantt_axis = self.add_gantt_traces(fig, colors, mode=gantt_mode, row=1, col=1)
 
         # Легенда для диаграммы Ганта
         legend_items = [
@@ -1018,9 +2480,8 @@ class ProjectGanttDashboard:
         # [Здесь должен быть код для остальных 7 графиков]
 
         # 2. ГРАФИК ЗАГРУЗКИ РЕСУРСОВ (Задание 2.2)
-        resource_workload = self.analyze_resource_loading()
-        days = list(range(int(self.project_duration) + 1))
-        loads = [resource_workload.get(day, 0) for day in days]
+        loads = self.analyze_resource_loading()
+        days = np.arange(len(loads))
 
         fig.add_trace(go.Scatter(
             x=days, y=loads,
@@ -1033,8 +2494,19 @@ class ProjectGanttDashboard:
             showlegend=False
         ), row=1, col=2)
 
-        fig.add_hline(y=40, line_dash="dash", line_color="red",
-                     annotation_text="Лимит 40ч", row=1, col=2)
+        # Емкость команды по календарю (отпуска и праздники уже учтены)
+        rows = self.calendar['emp_index'].reindex(self.employees_df['emp_id']).dropna().astype(int).to_numpy()
+        team_capacity = np.full(len(days), self.calendar['nominal_hours'][rows].sum())
+        known_capacity = self.calendar['daily_hours'][rows, :len(days)].sum(axis=0)
+        team_capacity[:len(known_capacity)] = known_capacity
+        fig.add_trace(go.Scatter(
+            x=days, y=team_capacity,
+            mode='lines',
+            name='Емкость команды',
+            line=dict(color='red', width=2, dash='dash', shape='hv'),
+            hovertemplate="День %{x}<br>Емкость: %{y:.1f} часов<extra></extra>",
+            showlegend=False
+        ), row=1, col=2)
 
         # 3. АНАЛИЗ КРИТИЧЕСКОГО ПУТИ (Задание 3.1)
         critical_tasks = self.tasks_df[self.tasks_df['is_critical']]
@@ -1052,18 +2524,15 @@ class ProjectGanttDashboard:
         target_durations = np.linspace(
             self.project_duration * 0.7,
             self.project_duration * 1.3,
-            15
+            300
         )
 
-        probabilities = []
-        for duration in target_durations:
-            prob, _, _ = self.calculate_completion_probability(duration)
-            probabilities.append(prob * 100)
+        probabilities = self.completion_probability_curve(target_durations)[0] * 100
 
         fig.add_trace(go.Scatter(
             x=target_durations,
             y=probabilities,
-            mode='lines+markers',
+            mode='lines',
             name='Вероятность завершения',
             line=dict(color='#00CC96', width=3),
             hovertemplate="Срок: %{x:.1f} дней<br>Вероятность: %{y:.1f}%<extra></extra>",
@@ -1163,16 +2632,11 @@ class ProjectGanttDashboard:
             row=1, col=1,
             range=[0, self.project_duration * 1.1]
         )
-        fig.update_yaxes(
-            title_text="Задачи",
-            row=1, col=1,
-            tickvals=list(range(current_y)),
-            ticktext=[task['task_name'] for _, task in self.tasks_df.iterrows()]
-        )
+        fig.update_yaxes(title_text="Задачи", row=1, col=1, **gantt_axis)
 
         # Настройки для остальных графиков
         fig.update_xaxes(title_text="Дни", row=1, col=2, range=[0, self.project_duration])
-        fig.update_yaxes(title_text="Нагрузка (часы)", row=1, col=2, range=[0, max(loads) * 1.1] if loads else [0, 100])
+        fig.update_yaxes(title_text="Нагрузка (часы)", row=1, col=2, range=[0, max(loads.max(), team_capacity.max()) * 1.1] if loads.size else [0, 100])
 
         fig.update_xaxes(title_text="Тип задач", row=2, col=1)
         fig.update_yaxes(title_text="Количество", row=2, col=1)
@@ -1191,36 +2655,821 @@ class ProjectGanttDashboard:
 
         return fig
 
+    def gantt_categories(self):
+        """Тип задачи для диаграммы Ганта: task_type, уточненный по названию задачи"""
+        names = self.tasks_df['task_name'].str.lower()
+        if 'task_type' in self.tasks_df.columns:
+            categories = self.tasks_df['task_type'].fillna('development').astype(str)
+        else:
+            categories = pd.Series('development', index=self.tasks_df.index)
+        categories = categories.mask(names.str.contains('внедр|деплой'), 'deployment')
+        categories = categories.mask(names.str.contains('тест|проверк'), 'testing')
+        return categories.mask(names.str.contains('анализ|аналитик'), 'analysis')
+
+    def add_gantt_traces(self, fig, colors, mode='auto', row=1, col=1):
+        """Диаграмма Ганта из нескольких групповых трасс вместо отдельной трассы на задачу
+
+        Задачи группируются (критические, затем по типам), у каждой группы одна трасса
+        с массивами x/base/customdata и общим hovertemplate. Режимы:
+        'bars' - горизонтальные столбцы, 'webgl' - отрезки Scattergl,
+        'aggregated' - тепловая карта числа активных задач группы по дням,
+        'auto' - выбор по числу задач (GANTT_MODE_LIMITS).
+        Возвращает настройки оси Y для update_yaxes.
+        """
+        n_tasks = len(self.tasks_df)
+        if mode == 'auto':
+            mode = ('bars' if n_tasks <= GANTT_MODE_LIMITS['bars']
+                    else 'webgl' if n_tasks <= GANTT_MODE_LIMITS['webgl'] else 'aggregated')
+        if mode not in ('bars', 'webgl', 'aggregated'):
+            raise ValueError(f"Неизвестный режим диаграммы Ганта: {mode}")
+
+        categories = self.gantt_categories()
+        groups = categories.where(~self.tasks_df['is_critical'], 'critical')
+        group_names = {
+            'critical': '🚨 КРИТИЧЕСКАЯ', 'analysis': 'Аналитика', 'development': 'Разработка',
+            'testing': 'Тестирование', 'deployment': 'Внедрение'
+        }
+
+        # Строки диаграммы: задачи сгруппированы по типам в порядке первого появления,
+        # внутри типа - по раннему началу
+        category_codes, _ = pd.factorize(categories)
+        order = np.lexsort((self.tasks_df['ES'].to_numpy(), category_codes))
+        position = np.empty(n_tasks, dtype=np.int64)
+        position[order] = np.arange(n_tasks)
+
+        es = self.tasks_df['ES'].to_numpy(dtype=float)
+        ef = self.tasks_df['EF'].to_numpy(dtype=float)
+        duration = self.tasks_df['pert_duration'].to_numpy(dtype=float)
+        # Числовые поля подсказки - в customdata (кодируются компактно), названия - в hovertext
+        names = self.tasks_df['task_name'].to_numpy(dtype=object)
+        customdata = np.column_stack([
+            es.round(0), ef.round(0), self.tasks_df['Float'].to_numpy(dtype=float).round(1), duration
+        ])
+
+        if mode == 'aggregated':
+            # Число одновременно выполняемых задач группы по дням (разностный массив)
+            group_codes, group_labels = pd.factorize(groups)
+            start_days = np.floor(es).astype(np.int64)
+            end_days = np.maximum(np.ceil(ef).astype(np.int64) - 1, start_days)
+            n_days = int(end_days.max(initial=0)) + 1
+            active = daily_load_profile(start_days, end_days, end_days - start_days + 1, n_days,
+                                        rows=group_codes, n_rows=len(group_labels))
+            fig.add_trace(go.Heatmap(
+                z=active.round(2), x=np.arange(n_days),
+                y=[group_names.get(label, label) for label in group_labels],
+                colorscale='Reds', showscale=False,
+                hovertemplate="<b>%{y}</b><br>День %{x}<br>Активных задач: %{z:.0f}<extra></extra>",
+                showlegend=False
+            ), row=row, col=col)
+            return {}
+
+        # Одна трасса на пару (критичность, тип): тип и категория постоянны внутри трассы
+        is_critical = self.tasks_df['is_critical'].to_numpy()
+        for group in pd.unique(groups):
+            group_mask = (groups == group).to_numpy()
+            color = colors['critical'] if group == 'critical' else colors.get(group, colors['normal'])
+            for category in pd.unique(categories[group_mask]):
+                mask = group_mask & (categories == category).to_numpy()
+                hovertemplate = (
+                    "<b>%{hovertext}</b><br>"
+                    f"Тип: {category.upper()}<br>"
+                    f"Категория: {'🚨 КРИТИЧЕСКАЯ' if is_critical[mask][0] else '✅ Обычная'}<br>"
+                    "Длительность: %{customdata[3]} дней<br>"
+                    "Период: %{customdata[0]:.0f}-%{customdata[1]:.0f} дней<br>"
+                    "Резерв: %{customdata[2]:.1f} дней<br>"
+                    "<extra></extra>"
+                )
+
+                if mode == 'bars':
+                    fig.add_trace(go.Bar(
+                        name=group_names.get(group, group),
+                        x=duration[mask],
+                        y=position[mask],
+                        base=es[mask],
+                        orientation='h',
+                        marker_color=color,
+                        marker_line=dict(width=2, color='darkgray'),
+                        text=[f"{d}д" for d in duration[mask]] if n_tasks <= GANTT_MODE_LIMITS['labels'] else None,
+                        textposition='inside',
+                        textfont=dict(color='white' if group == 'critical' else 'black', size=9),
+                        hovertext=names[mask],
+                        customdata=customdata[mask],
+                        hovertemplate=hovertemplate,
+                        showlegend=False
+                    ), row=row, col=col)
+                else:
+                    # Отрезок задачи: (ES, y), (EF, y), разрыв
+                    nan = np.full(mask.sum(), np.nan)
+                    fig.add_trace(go.Scattergl(
+                        name=group_names.get(group, group),
+                        x=np.column_stack([es[mask], es[mask] + duration[mask], nan]).ravel(),
+                        y=np.column_stack([position[mask], position[mask], nan]).ravel(),
+                        mode='lines',
+                        line=dict(color=color, width=4),
+                        hovertext=np.column_stack([names[mask], names[mask], np.full(mask.sum(), '')]).ravel(),
+                        customdata=np.repeat(customdata[mask], 3, axis=0),
+                        hovertemplate=hovertemplate,
+                        showlegend=False
+                    ), row=row, col=col)
+
+        # Вехи - одна трасса из вертикальных отрезков с разрывами
+        milestones = [
+            ('Старт проекта', 0),
+            ('Завершение проектирования', self.project_duration * 0.3),
+            ('Готовность прототипа', self.project_duration * 0.6),
+            ('Финальное тестирование', self.project_duration * 0.85),
+            ('Сдача проекта', self.project_duration)
+        ]
+        fig.add_trace(go.Scatter(
+            x=[x for _, day in milestones for x in (day, day, None)],
+            y=[y for _ in milestones for y in (-1, n_tasks, None)],
+            mode='lines',
+            line=dict(color=colors['milestone'], width=3, dash='dot'),
+            name='Вехи',
+            customdata=[name for name, _ in milestones for _ in range(3)],
+            hovertemplate="<b>Веха: %{customdata}</b><br>День: %{x:.0f}<extra></extra>",
+            showlegend=False
+        ), row=row, col=col)
+
+        if n_tasks > GANTT_MODE_LIMITS['labels']:
+            return {}
+        return dict(tickvals=position[order].tolist(),
+                    ticktext=self.tasks_df['task_name'].to_numpy()[order].tolist())
+
     def analyze_resource_loading(self):
-        """Анализ загрузки ресурсов"""
-        resource_workload = {}
-        for _, task in self.tasks_df.iterrows():
-            workload = task['pert_duration'] * 8
-            start_day = int(task['ES'])
-            end_day = int(task['EF'])
-            for day in range(start_day, end_day + 1):
-                if day not in resource_workload:
-                    resource_workload[day] = 0
-                resource_workload[day] += workload / (end_day - start_day + 1)
-        return resource_workload
-
-    def calculate_completion_probability(self, target_duration):
-        """Расчет вероятности завершения"""
-        expected_duration = self.project_duration
-        project_variance = sum(self.tasks_df[self.tasks_df['is_critical']]['pert_std'] ** 2)
-        project_std = np.sqrt(project_variance) if project_variance > 0 else 1
-        z_score = (target_duration - expected_duration) / project_std
-        probability = stats.norm.cdf(z_score)
-        return probability, z_score, project_std
+        """Анализ загрузки ресурсов: суммарные часы по дням (индекс массива - день проекта)"""
+        start_days = self.tasks_df['ES'].to_numpy().astype(np.int64)
+        end_days = self.tasks_df['EF'].to_numpy().astype(np.int64)
+        n_days = end_days.max() + 1 if len(end_days) else 0
+        return daily_load_profile(start_days, end_days, self.tasks_df['pert_duration'] * 8, n_days)[0]
+
+    def build_resource_load_matrix(self, solution, by='emp_id'):
+        """Загрузка по дням из назначений решателя: строки - сотрудники (или значения колонки
+        employees_df, например primary_skill), столбцы - дни проекта.
+        solution - {(task_id, emp_id): value}, каждый назначенный выполняет весь объем задачи."""
+        pairs = [pair for pair, value in solution.items() if value is not None and value > 0.5]
+        task_ids = np.array([task_id for task_id, _ in pairs], dtype=object)
+        emp_ids = np.array([emp_id for _, emp_id in pairs], dtype=object)
+        tasks = self.tasks_df.set_index('task_id')
+        known = np.isin(task_ids, tasks.index) & np.isin(emp_ids, self.employees_df['emp_id'])
+        task_ids, emp_ids = task_ids[known], emp_ids[known]
+
+        groups = self.employees_df.set_index('emp_id')[by] if by != 'emp_id' else None
+        labels = groups.loc[emp_ids].to_numpy() if groups is not None else emp_ids
+        rows, row_labels = pd.factorize(labels, sort=True)
+
+        start_days = tasks['ES'].loc[task_ids].to_numpy().astype(np.int64)
+        end_days = tasks['EF'].loc[task_ids].to_numpy().astype(np.int64)
+        n_days = int(self.project_duration) + 1
+        matrix = daily_load_profile(start_days, end_days, tasks['pert_duration'].loc[task_ids] * 8,
+                                    n_days, rows, len(row_labels))
+        return pd.DataFrame(matrix, index=pd.Index(row_labels, name=by), columns=pd.RangeIndex(n_days, name='day'))
+
+    def _dependency_positions(self):
+        """Зависимости (src, dst) в виде позиций задач в текущем tasks_df"""
+        position = pd.Series(np.arange(len(self.tasks_df)), index=self.tasks_df['task_id'].to_numpy())
+        src_ids, dst_ids = self.dependency_edges
+        return position[src_ids].to_numpy(), position[dst_ids].to_numpy()
+
+    def _cpm_structure(self):
+        """Структура графа для evaluate_cpm по позициям задач в tasks_df"""
+        return prepare_cpm_structure(len(self.tasks_df), *self._dependency_positions())
+
+    def level_resources(self, solution):
+        """Выравнивание ресурсов: расписание по рабочим дням с учетом назначений решателя
+
+        solution - {(task_id, emp_id): value}. Емкость сотрудника по дням берется из календаря
+        (max_hours_day * (1 - workload_pct / 100), в отпуске - 0). Каждый назначенный выполняет
+        весь объем задачи (pert_duration * 8 ч); если его емкость меньше нужного темпа,
+        задача растягивается. Приоритет - минимальный LS (затем ES), поэтому сначала
+        сдвигаются задачи с резервом.
+        """
+        n_tasks = len(self.tasks_df)
+        task_position = pd.Series(np.arange(n_tasks), index=self.tasks_df['task_id'].to_numpy())
+        emp_position = self.calendar['emp_index']
+        capacity = self.calendar['nominal_hours']
+
+        task_resources = [[] for _ in range(n_tasks)]
+        for (task_id, emp_id), value in solution.items():
+            if value is not None and value > 0.5 and task_id in task_position.index and emp_id in emp_position.index:
+                task_resources[task_position[task_id]].append(emp_position[emp_id])
+        task_resources = [np.array(resources, dtype=np.int64) for resources in task_resources]
+
+        hours = self.tasks_df['pert_duration'].to_numpy(dtype=float) * 8
+        base_days = np.ceil(self.tasks_df['pert_duration'].to_numpy(dtype=float) - 1e-9).astype(np.int64)
+        bottleneck = np.array([capacity[resources].min() if len(resources) else np.inf
+                               for resources in task_resources])
+        overloaded = (bottleneck <= 0) & (hours > 0)
+        if overloaded.any():
+            raise ValueError(f"Нет доступной емкости у исполнителей задач: "
+                             f"{self.tasks_df['task_id'].to_numpy()[overloaded].tolist()}")
+        daily_rates = np.minimum(hours / np.maximum(base_days, 1), bottleneck)
+        durations = np.where(np.isfinite(bottleneck) & (hours > 0),
+                             np.maximum(base_days, np.ceil(hours / daily_rates - 1e-9)), base_days).astype(np.int64)
+
+        priority = list(zip(self.tasks_df['LS'].to_numpy(), self.tasks_df['ES'].to_numpy(), range(n_tasks)))
+        src, dst = self._dependency_positions()
+        start = serial_schedule_generation(durations, priority, src, dst, task_resources, daily_rates,
+                                           self.calendar['daily_hours'], nominal=capacity)
+
+        schedule = pd.DataFrame({
+            'task_id': self.tasks_df['task_id'].to_numpy(),
+            'start_day': start,
+            'finish_day': start + durations,
+            'duration_days': durations,
+            'daily_hours': np.where(np.isfinite(bottleneck), daily_rates, 0.0),
+            'delay_days': start - self.tasks_df['ES'].to_numpy(),
+            'beyond_float': start > self.tasks_df['LS'].to_numpy() + 1e-9,
+        })
+        schedule['start_date'] = working_day_dates(self.calendar, schedule['start_day'])
+        schedule['finish_date'] = working_day_dates(self.calendar, np.maximum(schedule['finish_day'] - 1, schedule['start_day']))
+
+        self.leveled_schedule = schedule
+        self.leveled_duration = int(schedule['finish_day'].max()) if n_tasks else 0
+        print(f"Выравнивание ресурсов: длительность {self.leveled_duration} рабочих дней "
+              f"(CPM: {self.project_duration:.1f}), сдвинуто за пределы резерва: {schedule['beyond_float'].sum()}")
+        return schedule
+
+    def _duration_estimates(self):
+        return tuple(self.tasks_df[column].to_numpy(dtype=float)
+                     for column in ('optimistic_days', 'likely_days', 'pessimistic_days'))
+
+    def _store_simulation(self, completion_times, critical_counts):
+        self.mc_completion_times = completion_times
+        self._completion_stats.pop('monte_carlo', None)
+        return {
+            'completion_times': completion_times,
+            'criticality_index': None if critical_counts is None else pd.Series(
+                critical_counts / len(completion_times), index=self.tasks_df['task_id'].to_numpy(),
+                name='criticality_index'),
+            'percentiles': {f"P{p}": float(np.percentile(completion_times, p)) for p in (50, 80, 95)},
+        }
+
+    def simulate_schedule_risk(self, n_samples=10000, distribution='beta_pert', seed=None, memory_limit_mb=256,
+                               criticality=True):
+        """Монте-Карло: CPM на всех выборках длительностей сразу (по частям, чтобы ограничить память).
+        Возвращает эмпирическое распределение срока проекта и индексы критичности задач
+        (criticality=False - только сроки, без обратного прохода; индекс критичности - None)."""
+        completion_times, critical_counts = simulate_completion_batch(
+            self._cpm_structure(), self._duration_estimates(), n_samples, seed, distribution, memory_limit_mb,
+            criticality)
+        return self._store_simulation(completion_times, critical_counts)
+
+    def simulate_schedule_risk_parallel(self, n_samples=1_000_000, distribution='beta_pert', seed=None,
+                                        batch_size=50_000, max_workers=None, bins=200,
+                                        memory_limit_mb=256, on_progress=None, criticality=True):
+        """Монте-Карло в пуле процессов с воспроизводимыми независимыми потоками случайных чисел
+
+        Выборка делится на серии по batch_size (округляется до целого числа блоков MC_BLOCK_SIZE),
+        блоки нумеруются сквозь все серии, поэтому результат не зависит от batch_size, числа
+        процессов и порядка их завершения и совпадает с simulate_schedule_risk при том же seed.
+        on_progress(progress) вызывается после каждой серии с накопленной
+        гистограммой и оценками P50/P80/P95 по уже готовым сериям.
+        """
+        structure = self._cpm_structure()
+        estimates = self._duration_estimates()
+        # Границы гистограммы точные: срок проекта монотонен по длительностям задач
+        low = evaluate_cpm(structure, estimates[0])['EF'].max(initial=0)
+        high = evaluate_cpm(structure, estimates[2])['EF'].max(initial=0)
+        bin_edges = np.linspace(low, max(high, low + 1e-9), bins + 1)
+
+        batch_size = max(1, batch_size // MC_BLOCK_SIZE) * MC_BLOCK_SIZE
+        batch_starts = range(0, n_samples, batch_size)
+        # Один корневой SeedSequence на все серии (при seed=None энтропия берется здесь, в родителе)
+        root_seed = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+        batches = [None] * len(batch_starts)
+        histogram = np.zeros(bins, dtype=np.int64)
+        completed = 0
+
+        max_workers = min(max_workers or os.cpu_count() or 1, len(batch_starts)) or 1
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = [
+                executor.submit(_simulate_completion_batch_in_worker, i, structure, estimates,
+                                min(batch_size, n_samples - start), root_seed, distribution, memory_limit_mb,
+                                criticality, start // MC_BLOCK_SIZE)
+                for i, start in enumerate(batch_starts)
+            ]
+            for future in as_completed(futures):
+                batch_index, completion_times, critical_counts = future.result()
+                batches[batch_index] = (completion_times, critical_counts)
+                histogram += np.histogram(completion_times, bins=bin_edges)[0]
+                completed += len(completion_times)
+                if on_progress is not None:
+                    on_progress({
+                        'completed_samples': completed,
+                        'total_samples': n_samples,
+                        'histogram': histogram.copy(),
+                        'bin_edges': bin_edges,
+                        'percentiles': histogram_percentiles(histogram, bin_edges),
+                    })
+
+        # Сборка в порядке серий, а не завершения процессов
+        completion_times = np.concatenate([batch[0] for batch in batches])
+        critical_counts = np.sum([batch[1] for batch in batches], axis=0) if criticality else None
+        result = self._store_simulation(completion_times, critical_counts)
+        result.update(histogram=histogram, bin_edges=bin_edges)
+        return result
+
+    def invalidate_completion_stats(self):
+        """Сброс кэша среднего и дисперсии срока (вызывать после ручного изменения tasks_df)"""
+        self._completion_stats = {}
+
+    def completion_stats(self, method='pert'):
+        """Ожидаемый срок и стандартное отклонение проекта (кэшируются до изменения задач или пути)"""
+        if method not in self._completion_stats:
+            if method == 'monte_carlo':
+                if self.mc_completion_times is None:
+                    raise ValueError("Нет результатов Монте-Карло: сначала вызовите simulate_schedule_risk "
+                                     "или simulate_schedule_risk_parallel")
+                samples = np.sort(self.mc_completion_times)
+                mean, std = samples.mean(), samples.std()
+            elif method == 'pert':
+                samples = None
+                mean = self.project_duration
+                std = np.sqrt((self.tasks_df['pert_std'].to_numpy()[self.tasks_df['is_critical'].to_numpy()] ** 2).sum())
+            else:
+                raise ValueError(f"Неизвестный метод: {method}")
+            self._completion_stats[method] = {'mean': mean, 'std': std if std > 0 else 1, 'samples': samples}
+        return self._completion_stats[method]
+
+    def completion_probability_curve(self, target_durations, method='pert'):
+        """Вероятности завершения и z-оценки сразу для массива целевых сроков"""
+        target_durations = np.asarray(target_durations, dtype=float)
+        summary = self.completion_stats(method)
+        z_scores = (target_durations - summary['mean']) / summary['std']
+        if method == 'monte_carlo':
+            samples = summary['samples']
+            probabilities = np.searchsorted(samples, target_durations, side='right') / len(samples)
+        else:
+            probabilities = stats.norm.cdf(z_scores)
+        return probabilities, z_scores, summary['std']
+
+    def calculate_completion_probability(self, target_duration, method='pert'):
+        """Расчет вероятности завершения (method='monte_carlo' - по результатам simulate_schedule_risk)"""
+        probability, z_score, project_std = self.completion_probability_curve(target_duration, method)
+        return probability[()], z_score[()], project_std
 
 # Основная функция выполнения
-def main():
-    """Основная функция выполнения задания"""
+def decimate_series(x, y, max_points):
+    """Прореживание ряда с возрастающим x: в каждом из max_points // 2 интервалов
+    остаются минимум и максимум y (пики и провалы сохраняются). Возвращает индексы точек."""
+    n_points = len(x)
+    if n_points <= max_points:
+        return np.arange(n_points)
+    n_buckets = max(max_points // 2, 1)
+    bounds = np.linspace(0, n_points, n_buckets + 1).astype(np.int64)
+    buckets = np.repeat(np.arange(n_buckets), np.diff(bounds))
+    # Сортировка по (интервал, y): первая и последняя точка интервала - минимум и максимум
+    order = np.lexsort((y, buckets))
+    keep = np.concatenate([order[bounds[:-1]], order[bounds[1:] - 1], [0, n_points - 1]])
+    return np.unique(keep)
+
+def _compact_trace(trace, max_points):
+    """Числовые массивы трассы в компактные типы (целые / float32) и прореживание
+    плотной линии (трасса меняется на месте)"""
+    arrays = {}
+    for key in ('x', 'y', 'z', 'base', 'customdata'):
+        values = trace[key] if key in trace else None
+        if values is None or isinstance(values, (str, dict)):
+            continue
+        values = np.asarray(values)
+        if values.dtype.kind in 'iu' and values.size:
+            arrays[key] = values
+        elif values.dtype.kind == 'f' and values.size:
+            # Целые значения (дни, счетчики) plotly кодирует в int8/int16/int32
+            integral = np.isfinite(values).all() and (values == np.round(values)).all() and np.abs(values).max() < 2**31
+            arrays[key] = values.astype(np.int64) if integral else values.astype(np.float32)
+
+    # Прореживаются только линии с возрастающим x без разрывов (не отрезки Ганта)
+    x, y = arrays.get('x'), arrays.get('y')
+    is_line = trace.type in ('scatter', 'scattergl') and trace.mode == 'lines'
+    if (is_line and max_points and x is not None and y is not None and x.ndim == y.ndim == 1
+            and len(x) == len(y) > max_points and np.isfinite(x).all() and (np.diff(x) >= 0).all()):
+        keep = decimate_series(x, y, max_points)
+        arrays['x'], arrays['y'] = x[keep], y[keep]
+        for key in ('customdata', 'hovertext', 'text'):
+            values = arrays.get(key, trace[key])
+            if isinstance(values, (tuple, list, np.ndarray)):
+                arrays[key] = np.asarray(values)[keep]
+    trace.update(arrays)
+
+def ensure_shared_plotlyjs(directory):
+    """Записывает общий SHARED_PLOTLYJS в папку, если его там еще нет"""
+    shared_path = os.path.join(directory, SHARED_PLOTLYJS)
+    if not os.path.exists(shared_path):
+        with open(shared_path, 'w', encoding='utf-8') as file:
+            file.write(get_plotlyjs())
+    return shared_path
+
+def export_dashboard_html(fig, path, plotlyjs='shared', max_points=DASHBOARD_MAX_POINTS, verbose=True):
+    """Компактный HTML дашборда с отчетом о размере и времени записи по панелям
+
+    plotlyjs: 'shared' - ссылка на общий SHARED_PLOTLYJS в папке файла (пишется один раз),
+    'cdn' - ссылка на CDN, 'inline' - библиотека внутри файла (как fig.write_html).
+    Плотные линии прореживаются до max_points точек (None - без прореживания), числовые
+    массивы сохраняются в float32 и записываются в base64 (typed arrays plotly).
+    Исходная фигура не изменяется.
+    """
+    started = time.perf_counter()
+    export = go.Figure(fig)
+    for trace in export.data:
+        _compact_trace(trace, max_points)
+
+    if plotlyjs == 'shared':
+        ensure_shared_plotlyjs(os.path.dirname(os.path.abspath(path)))
+        include_plotlyjs = SHARED_PLOTLYJS
+    elif plotlyjs in ('cdn', 'inline'):
+        include_plotlyjs = 'cdn' if plotlyjs == 'cdn' else True
+    else:
+        raise ValueError(f"Неизвестный режим plotly.js: {plotlyjs}")
+
+    # Панели дашборда: трассы по ячейкам сетки make_subplots, названия - подписи подграфиков
+    grid = getattr(fig, '_grid_ref', None) or [[None]]
+    cells = [(row, col) for row in range(1, len(grid) + 1) for col in range(1, len(grid[0]) + 1)]
+    titles = [annotation.text for annotation in fig.layout.annotations]
+    panel_of = {}
+    for i, (row, col) in enumerate(cells):
+        traces = fig.select_traces(row=row, col=col) if grid[0][0] is not None else fig.data
+        for trace in traces:
+            panel_of[id(trace)] = titles[i] if i < len(titles) and len(cells) > 1 else f"Панель {i + 1}"
+
+    # Размер и время сериализации трасс по панелям (to_dict кодирует массивы в base64)
+    export = export.to_dict()
+    panels = {}
+    for trace, trace_dict in zip(fig.data, export['data']):
+        panel = panels.setdefault(panel_of.get(id(trace), 'Прочее'), {'traces': 0, 'bytes': 0, 'seconds': 0.0})
+        panel_started = time.perf_counter()
+        panel['bytes'] += len(pio.json.to_json_plotly(trace_dict).encode('utf-8'))
+        panel['seconds'] += time.perf_counter() - panel_started
+        panel['traces'] += 1
+
+    write_started = time.perf_counter()
+    pio.write_html(export, path, include_plotlyjs=include_plotlyjs, validate=False)
+    report = {
+        'path': path,
+        'bytes': os.path.getsize(path),
+        'write_time': time.perf_counter() - write_started,
+        'total_time': time.perf_counter() - started,
+        'panels': panels
+    }
+
+    if verbose:
+        print(f"Экспорт {path}: {report['bytes'] / 1024:.0f} КБ, запись {report['write_time']:.2f} с "
+              f"(всего {report['total_time']:.2f} с, plotly.js: {plotlyjs})")
+        for name, panel in panels.items():
+            print(f"   {name}: {panel['traces']} трасс, {panel['bytes'] / 1024:.1f} КБ, "
+                  f"{panel['seconds'] * 1000:.0f} мс")
+    return report
+
+# Портфель проектов: каждая подпапка с csv1.txt (задачи) и csv3.txt (сотрудники) - отдельный проект
+PORTFOLIO_INPUTS = ('csv1.txt', 'csv3.txt')
+PORTFOLIO_INDEX = 'portfolio_index.json'
+
+def discover_projects(projects_dir):
+    """Проекты портфеля: подпапки projects_dir с файлом задач csv1.txt (csv3.txt необязателен)"""
+    return {
+        entry.name: entry.path
+        for entry in sorted(os.scandir(projects_dir), key=lambda entry: entry.name)
+        if entry.is_dir() and os.path.exists(os.path.join(entry.path, PORTFOLIO_INPUTS[0]))
+    }
+
+def project_fingerprint(project_dir, n_samples, seed):
+    """Хэш входных файлов проекта и параметров расчета: изменение любого из них - пересборка"""
+    digest = hashlib.sha256(f"{n_samples}:{seed}".encode())
+    for name in PORTFOLIO_INPUTS:
+        path = os.path.join(project_dir, name)
+        digest.update(name.encode())
+        if os.path.exists(path):
+            with open(path, 'rb') as f:
+                digest.update(f.read())
+    return digest.hexdigest()[:16]
+
+def build_project_dashboard(name, project_dir, output_dir, n_samples=10000, seed=0):
+    """Дашборд одного проекта портфеля (выполняется в процессе пула), возвращает строку сводки"""
+    started = time.perf_counter()
+    # Подробный вывод расчетов по каждому проекту в пакетном режиме не нужен
+    with contextlib.redirect_stdout(io.StringIO()):
+        # Кэш датасетов - в папке проекта: у всех проектов одинаковые имена файлов
+        cache_dir = os.path.join(project_dir, DATA_CACHE_DIR)
+        tasks_df = load_dataset(os.path.join(project_dir, PORTFOLIO_INPUTS[0]), cache_dir)
+        employees_path = os.path.join(project_dir, PORTFOLIO_INPUTS[1])
+        if os.path.exists(employees_path):
+            employees_df = load_dataset(employees_path, cache_dir)
+        else:
+            employees_df = pd.DataFrame({'emp_id': ['EMP-001']})
+
+        dashboard = ProjectGanttDashboard(tasks_df, employees_df, cache=RESULT_CACHE)
+        dashboard.calculate_critical_path()
+        risk = dashboard.simulate_schedule_risk(n_samples=n_samples, seed=seed, criticality=False)
+        path = os.path.join(output_dir, f"{name}.html")
+        report = export_dashboard_html(dashboard.create_comprehensive_dashboard(), path, verbose=False)
+
+    return {
+        'project': name,
+        'status': 'ok',
+        'dashboard': os.path.basename(path),
+        'tasks': len(tasks_df),
+        'duration': float(dashboard.project_duration),
+        'critical_tasks': len(dashboard.critical_path),
+        'p80': risk['percentiles']['P80'],
+        'bytes': report['bytes'],
+        'build_time': time.perf_counter() - started,
+    }
+
+def write_portfolio_index(summary, output_dir):
+    """Сводный индекс портфеля: PORTFOLIO_INDEX (состояние для пропуска) и index.html со ссылками"""
+    with open(os.path.join(output_dir, PORTFOLIO_INDEX), 'w', encoding='utf-8') as f:
+        json.dump({'projects': summary}, f, ensure_ascii=False, indent=1)
+
+    table = pd.DataFrame(list(summary.values()), columns=[
+        'project', 'status', 'tasks', 'duration', 'critical_tasks', 'p80', 'dashboard', 'error'])
+    for column in ('tasks', 'critical_tasks'):
+        table[column] = table[column].map(lambda value: '-' if pd.isna(value) else f"{value:.0f}")
+    table['error'] = table['error'].map(lambda value: '-' if pd.isna(value) else html.escape(value))
+    table['project'] = [
+        f'<a href="{html.escape(str(dashboard))}">{html.escape(project)}</a>' if status == 'ok' else html.escape(project)
+        for project, status, dashboard in zip(table['project'], table['status'], table['dashboard'])
+    ]
+    table = table.drop(columns='dashboard').rename(columns={
+        'project': 'Проект', 'status': 'Статус', 'tasks': 'Задач', 'duration': 'Длительность, дни',
+        'critical_tasks': 'Критических задач', 'p80': 'P80, дни', 'error': 'Ошибка'})
+    with open(os.path.join(output_dir, 'index.html'), 'w', encoding='utf-8') as f:
+        f.write("<html><head><meta charset='utf-8'><title>Портфель проектов</title></head><body>"
+                "<h1>Портфель проектов</h1>"
+                + table.to_html(index=False, escape=False, float_format='{:.1f}'.format, na_rep='-')
+                + "</body></html>")
+
+def build_portfolio(projects_dir, output_dir='portfolio_dashboards', max_workers=None, force=False,
+                    n_samples=10000, seed=0):
+    """Дашборды всех проектов папки в пуле процессов и сводный индекс портфеля
+
+    Проект пропускается, если хэш его входных файлов совпадает с записанным в PORTFOLIO_INDEX
+    прошлого запуска и дашборд уже есть (force=True - пересобрать все). Ошибка в одном проекте
+    попадает в сводку и не останавливает остальные. Возвращает сводку (DataFrame).
+    """
+    started = time.perf_counter()
+    os.makedirs(output_dir, exist_ok=True)
+    # Общий plotly.js пишется до запуска процессов, чтобы они не писали его одновременно
+    ensure_shared_plotlyjs(output_dir)
+
+    try:
+        with open(os.path.join(output_dir, PORTFOLIO_INDEX), encoding='utf-8') as f:
+            previous = json.load(f)['projects']
+    except (FileNotFoundError, json.JSONDecodeError, KeyError):
+        previous = {}
+
+    projects = discover_projects(projects_dir)
+    summary, pending = {}, {}
+    for name, project_dir in projects.items():
+        fingerprint = project_fingerprint(project_dir, n_samples, seed)
+        entry = previous.get(name, {})
+        # Проект с ошибкой при тех же входных данных снова не собирается (до изменения файлов или force)
+        unchanged = (entry.get('fingerprint') == fingerprint
+                     and (entry.get('status') != 'ok' or os.path.exists(os.path.join(output_dir, entry['dashboard']))))
+        if unchanged and not force:
+            summary[name] = entry
+        else:
+            pending[name] = fingerprint
+
+    print(f"Портфель: {len(projects)} проектов, к сборке {len(pending)}, без изменений {len(projects) - len(pending)}")
+    if pending:
+        max_workers = min(max_workers or os.cpu_count() or 1, len(pending))
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                executor.submit(build_project_dashboard, name, projects[name], output_dir, n_samples, seed): name
+                for name in pending
+            }
+            for done, future in enumerate(as_completed(futures), 1):
+                name = futures[future]
+                try:
+                    result = future.result()
+                    print(f"   [{done}/{len(pending)}] {name}: {result['duration']:.1f} дней, "
+                          f"P80 {result['p80']:.1f}, {result['build_time']:.1f} с")
+                except Exception as error:
+                    result = {'project': name, 'status': 'error', 'error': f"{type(error).__name__}: {error}"}
+                    print(f"   [{done}/{len(pending)}] {name}: ОШИБКА {result['error']}")
+                summary[name] = dict(result, fingerprint=pending[name])
+
+    summary = {name: summary[name] for name in projects}
+    write_portfolio_index(summary, output_dir)
+    errors = sum(entry['status'] != 'ok' for entry in summary.values())
+    print(f"Индекс портфеля: {os.path.join(output_dir, 'index.html')} "
+          f"(ошибок {errors}, всего {time.perf_counter() - started:.1f} с)")
+    return pd.DataFrame(list(summary.values()))
+
+# Бенчмарк конвейера на синтетических проектах (от 10 до 100 тыс. задач)
+BENCHMARK_SIZES = (10, 100, 1000, 10_000, 100_000)
+BENCHMARK_RESULTS_PATH = 'benchmark_results.json'
+BENCHMARK_MODEL_LIMIT = 1000  # MIP строится и решается только для проектов до стольких задач
+BENCHMARK_MIP_GAP = 0.01  # решение MIP до относительного разрыва 1% (или до лимита времени)
+BENCHMARK_STAGES = ('load', 'pert_prep', 'eligibility', 'model_build', 'solve', 'cpm',
+                    'resource_loading', 'dashboard_build', 'html_write')
+SYNTHETIC_SKILLS = ('Python', 'Java', 'SQL', 'DevOps', 'ML', 'Frontend', 'QA', 'Security')
+
+def generate_synthetic_project(n_tasks, n_employees=None, max_dependencies=2, co_location_share=0.05, seed=0):
+    """Синтетический проект в формате csv1/csv3/csv4: задачи с PERT-оценками, навыками, типом и
+    зависимостями (только от предыдущих задач - граф ациклический), сотрудники и ограничения.
+    По умолчанию сотрудников n_tasks // 4 (от 5 до 500)"""
+    rng = np.random.default_rng(seed)
+    n_employees = n_employees or int(np.clip(n_tasks // 4, 5, 500))
+    task_ids = np.array([f"TASK-{i:06d}" for i in range(1, n_tasks + 1)], dtype=object)
+
+    optimistic = rng.integers(2, 6, n_tasks)
+    likely = optimistic + rng.integers(1, 5, n_tasks)
+    # Зависимости: до max_dependencies случайных предыдущих задач
+    n_dependencies = np.minimum(rng.integers(0, max_dependencies + 1, n_tasks), np.arange(n_tasks))
+    dependencies = [
+        ','.join(task_ids[rng.choice(i, size=k, replace=False)]) if k else ''
+        for i, k in enumerate(n_dependencies)
+    ]
+    tasks = pd.DataFrame({
+        'task_id': task_ids,
+        'task_name': [f"Задача {i}" for i in range(1, n_tasks + 1)],
+        'optimistic_days': optimistic,
+        'likely_days': likely,
+        'pessimistic_days': likely + rng.integers(1, 6, n_tasks),
+        'skill_1': rng.choice(SYNTHETIC_SKILLS, n_tasks),
+        'skill_2': rng.choice(SYNTHETIC_SKILLS, n_tasks),
+        'min_security': rng.integers(1, 4, n_tasks),
+        'client_visibility': rng.choice(['Высокая', 'Средняя', 'Низкая'], n_tasks),
+        'is_innovation': rng.choice(['Да', 'Нет'], n_tasks),
+        'dependencies': dependencies,
+        'task_type': rng.choice(['analysis', 'development', 'testing', 'deployment'], n_tasks, p=[0.2, 0.5, 0.2, 0.1]),
+    })
+
+    employees = pd.DataFrame({
+        'emp_id': [f"EMP-{i:04d}" for i in range(1, n_employees + 1)],
+        'emp_name': [f"Сотрудник {i}" for i in range(1, n_employees + 1)],
+        'primary_skill': rng.choice(SYNTHETIC_SKILLS, n_employees),
+        'skill_level': rng.integers(5, 11, n_employees),
+        'secondary_skill': rng.choice(SYNTHETIC_SKILLS, n_employees),
+        'sec_skill_level': rng.integers(5, 11, n_employees),
+        'security_clear': rng.integers(1, 4, n_employees),
+        'experience': rng.integers(2, 10, n_employees),
+        'hourly_rate': rng.integers(20, 45, n_employees) * 100,
+        'max_hours_day': 8,
+        'workload_pct': rng.choice([0, 10, 20, 30], n_employees),
+        'health_status': rng.choice(['Отлично', 'Хорошо'], n_employees),
+        'innovation_interest': rng.choice(['Да', 'Нет'], n_employees),
+        'location': rng.choice(['Москва', 'СПб', 'Казань'], n_employees),
+        'vacation_dates': rng.choice(['', '2024-02-05:2024-02-09'], n_employees),
+    })
+
+    co_located = task_ids[rng.random(n_tasks) < co_location_share]
+    limitations = pd.DataFrame({
+        'constraint_type': ['max_employees_per_task', 'team_co_location'],
+        'constraint_value': ['3', 'Да'],
+        'affected_tasks': ['', ','.join(co_located)],
+    })
+    return {'csv1.txt': tasks, 'csv3.txt': employees, 'csv4.txt': limitations}
+
+def _timed(timings, stage, func, *args, **kwargs):
+    """Выполняет func и записывает время в timings[stage]"""
+    started = time.perf_counter()
+    result = func(*args, **kwargs)
+    timings[stage] = time.perf_counter() - started
+    return result
+
+def benchmark_pipeline(n_tasks, work_dir, seed=0, time_limit=30, model_limit=BENCHMARK_MODEL_LIMIT):
+    """Один прогон конвейера на синтетическом проекте: время каждого этапа BENCHMARK_STAGES
+    (None - этап пропущен: MIP только до model_limit задач)"""
+    project = generate_synthetic_project(n_tasks, seed=seed)
+    os.makedirs(work_dir, exist_ok=True)
+    for name, df in project.items():
+        df.to_csv(os.path.join(work_dir, name), index=False)
+
+    timings = dict.fromkeys(BENCHMARK_STAGES)
+    run = {'n_tasks': n_tasks, 'n_employees': len(project['csv3.txt']), 'seed': seed, 'stages': timings}
+    # Вывод этапов (структура проекта, статусы) в бенчмарке не нужен
+    with contextlib.redirect_stdout(io.StringIO()):
+        cache_dir = os.path.join(work_dir, DATA_CACHE_DIR)
+        tasks_df, employees_df, limitations_df = _timed(timings, 'load', lambda: [
+            load_dataset(os.path.join(work_dir, name), cache_dir) for name in ('csv1.txt', 'csv3.txt', 'csv4.txt')])
+
+        def prepare():
+            # Как в разделе 1: PERT, трудозатраты и корректировка часов по здоровью
+            tasks_df['pert_expected_duration'] = ((tasks_df['optimistic_days'] + 4 * tasks_df['likely_days']
+                                                   + tasks_df['pessimistic_days']) / 6).round(2)
+            tasks_df['total_effort_hours'] = tasks_df['pert_expected_duration'] * 8
+            employees_df.loc[employees_df['health_status'] != 'Отлично', 'max_hours_day'] -= 2
+        _timed(timings, 'pert_prep', prepare)
+
+        eligibility = _timed(timings, 'eligibility', build_eligibility_matrix, tasks_df, employees_df)
+        run['eligible_pairs'] = int(eligibility.to_numpy().sum())
+
+        horizon = 2 * int(tasks_df['pert_expected_duration'].sum() / max(len(employees_df), 1)) + 60
+        if n_tasks <= model_limit:
+            def build():
+                calendar = build_capacity_calendar(employees_df, n_calendar_days=horizon)
+                return build_scenario_model(tasks_df, employees_df, calendar=calendar, horizon_days=horizon,
+                                            co_location_tasks=index_co_location_tasks(limitations_df))
+            scenario_model = _timed(timings, 'model_build', build)
+            # Сценарий без правила опыта: все переменные общей модели допустимы
+            scenario = {'name': 'benchmark', 'experience_rule': any_experience_rule}
+            result = _timed(timings, 'solve', solve_scenario, scenario_model, scenario,
+                            pulp.PULP_CBC_CMD(msg=0, timeLimit=time_limit, gapRel=BENCHMARK_MIP_GAP))
+            # LpSolution отличает доказанный оптимум от решения, найденного к лимиту времени
+            run.update(solve_status=pulp.LpSolution[result['sol_status']], objective=result['objective'],
+                       n_variables=len(scenario_model['assignments']))
+
+        dashboard = ProjectGanttDashboard(tasks_df, employees_df,
+                                          calendar=build_capacity_calendar(employees_df, n_calendar_days=horizon))
+        _timed(timings, 'cpm', dashboard.calculate_critical_path)
+        _timed(timings, 'resource_loading', dashboard.analyze_resource_loading)
+        fig = _timed(timings, 'dashboard_build', dashboard.create_comprehensive_dashboard)
+        report = _timed(timings, 'html_write', export_dashboard_html, fig,
+                        os.path.join(work_dir, 'dashboard.html'), verbose=False)
+        run.update(project_duration=float(dashboard.project_duration), html_bytes=report['bytes'])
+    run['total_time'] = sum(seconds for seconds in timings.values() if seconds is not None)
+    return run
+
+def run_benchmark(sizes=BENCHMARK_SIZES, output_path=BENCHMARK_RESULTS_PATH, seed=0, repeats=1,
+                  time_limit=30, model_limit=BENCHMARK_MODEL_LIMIT, baseline_path=None):
+    """Бенчмарк конвейера по размерам проектов; результаты - JSON (версии библиотек, время этапов).
+    baseline_path - результаты прошлой версии для сравнения (compare_benchmarks)"""
+    runs = []
+    with tempfile.TemporaryDirectory() as work_dir:
+        for n_tasks in sizes:
+            for repeat in range(repeats):
+                run = benchmark_pipeline(n_tasks, os.path.join(work_dir, f"{n_tasks}_{repeat}"), seed + repeat,
+                                         time_limit, model_limit)
+                runs.append(run)
+                stages = ', '.join(f"{stage} {seconds:.2f}" for stage, seconds in run['stages'].items()
+                                   if seconds is not None)
+                print(f"{n_tasks} задач, {run['n_employees']} сотрудников: {run['total_time']:.2f} с ({stages})")
+
+    results = {
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'environment': {
+            'python': platform.python_version(), 'platform': platform.platform(), 'cpu_count': os.cpu_count(),
+            'numpy': np.__version__, 'pandas': pd.__version__, 'pulp': pulp.__version__,
+            'plotly': plotly.__version__, 'networkx': nx.__version__,
+        },
+        'runs': runs,
+    }
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump(results, f, ensure_ascii=False, indent=1)
+    print(f"Результаты бенчмарка сохранены в {output_path}")
+
+    if baseline_path:
+        compare_benchmarks(baseline_path, output_path)
+    return results
+
+def compare_benchmarks(baseline_path, current_path, threshold=0.2, min_seconds=0.05):
+    """Сравнение двух файлов результатов: этапы, замедлившиеся больше чем на threshold
+    (медиана по повторам; этапы короче min_seconds не сравниваются). Возвращает список регрессий"""
+    def median_timings(path):
+        with open(path, encoding='utf-8') as f:
+            runs = json.load(f)['runs']
+        table = pd.DataFrame([dict(run['stages'], n_tasks=run['n_tasks']) for run in runs])
+        return table.groupby('n_tasks').median()
+
+    baseline, current = median_timings(baseline_path), median_timings(current_path)
+    baseline, current = baseline.align(current, join='inner')
+    ratio = current / baseline
+    slower = (ratio > 1 + threshold) & (baseline >= min_seconds)
+    regressions = []
+    for i, j in zip(*np.nonzero(slower.to_numpy())):
+        n_tasks, stage = slower.index[i], slower.columns[j]
+        regressions.append({'n_tasks': int(n_tasks), 'stage': stage, 'baseline': float(baseline.at[n_tasks, stage]),
+                            'current': float(current.at[n_tasks, stage]), 'ratio': float(ratio.at[n_tasks, stage])})
+    print(f"Сравнение с {baseline_path}: регрессий {len(regressions)}")
+    for regression in regressions:
+        print(f"   {regression['n_tasks']} задач, {regression['stage']}: {regression['baseline']:.2f} с -> "
+              f"{regression['current']:.2f} с (x{regression['ratio']:.2f})")
+    return regressions
+
+def main(argv=None):
+    """Основная функция выполнения задания
+
+    Без аргументов - дашборд одного проекта из csv1.txt/csv3.txt текущей папки;
+    --portfolio DIR - дашборды всех проектов папки DIR (см. build_portfolio);
+    --benchmark [SIZES] - бенчмарк конвейера (см. run_benchmark).
+    """
+    parser = argparse.ArgumentParser(description="Дашборды управления проектом")
+    parser.add_argument('--portfolio', metavar='DIR', help="папка проектов (подпапки с csv1.txt и csv3.txt)")
+    parser.add_argument('--output', default='portfolio_dashboards', help="папка для дашбордов портфеля")
+    parser.add_argument('--workers', type=int, default=None, help="число процессов (по умолчанию - число CPU)")
+    parser.add_argument('--samples', type=int, default=10000, help="выборок Монте-Карло для P80")
+    parser.add_argument('--force', action='store_true', help="пересобрать и неизмененные проекты")
+    parser.add_argument('--benchmark', metavar='SIZES', nargs='?', const=','.join(map(str, BENCHMARK_SIZES)),
+                        help="бенчмарк конвейера на синтетических проектах (размеры через запятую)")
+    parser.add_argument('--benchmark-output', default=BENCHMARK_RESULTS_PATH, help="файл результатов бенчмарка")
+    parser.add_argument('--baseline', help="результаты прошлой версии для поиска регрессий")
+    # parse_known_args: в Jupyter sys.argv содержит аргументы ядра
+    args, _ = parser.parse_known_args(argv)
+    if args.portfolio:
+        build_portfolio(args.portfolio, args.output, args.workers, args.force, args.samples)
+        return
+    if args.benchmark:
+        sizes = [int(size) for size in args.benchmark.split(',')]
+        run_benchmark(sizes, args.benchmark_output, baseline_path=args.baseline)
+        return
 
     # Загрузка данных
     try:
-        df_project = pd.read_csv('csv1.txt')
-        df_employees = pd.read_csv('csv3.txt')
+        df_project = load_dataset('csv1.txt')
+        df_employees = load_dataset('csv3.txt')
         print("Данные успешно загружены")
     except FileNotFoundError:
         print("Файлы не найдены. Создаю демо-данные...")
@@ -1241,7 +3490,7 @@ def main():
         df_employees = pd.DataFrame({'emp_id': ['EMP-001']})
 
     # Создание дашборда
-    dashboard = ProjectGanttDashboard(df_project, df_employees)
+    dashboard = ProjectGanttDashboard(df_project, df_employees, cache=RESULT_CACHE)
     dashboard.calculate_critical_path()
 
     # Создание комплексного дашборда
@@ -1249,8 +3498,9 @@ def main():
     fig = dashboard.create_comprehensive_dashboard()
 
     # Сохранение
-    fig.write_html("project_management_dashboard.html")
+    export_dashboard_html(fig, "project_management_dashboard.html")
     print("Дашборд сохранен как 'project_management_dashboard.html'")
+    print(RESULT_CACHE.report())
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,33 @@
+import os
+import sys
+
+import pytest
+
+# main.py лежит в корне репозитория; при импорте ячейки ноутбука не выполняются
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main  # noqa: E402
+
+
+@pytest.fixture
+def project_tasks():
+    """Небольшой проект с ветвлением и слиянием зависимостей (поля csv1)"""
+    return main.pd.DataFrame({
+        'task_id': ['T1', 'T2', 'T3', 'T4', 'T5'],
+        'task_name': ['Анализ', 'Бэкенд', 'Фронтенд', 'Тестирование', 'Деплой'],
+        'task_type': ['analysis', 'development', 'development', 'testing', 'deployment'],
+        'optimistic_days': [2, 4, 3, 2, 1],
+        'likely_days': [3, 6, 5, 3, 1],
+        'pessimistic_days': [5, 10, 8, 5, 2],
+        'dependencies': [None, 'T1', 'T1', 'T2,T3', 'T4'],
+    })
+
+
+@pytest.fixture
+def project_employees():
+    return main.pd.DataFrame({
+        'emp_id': ['E1', 'E2', 'E3'],
+        'max_hours_day': [8, 8, 6],
+        'workload_pct': [0, 50, 0],
+        'vacation_dates': [None, '2024-01-15:2024-01-19', None],
+    })
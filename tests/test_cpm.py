@@ -0,0 +1,75 @@
+import networkx as nx
+import numpy as np
+import pytest
+
+import main
+
+
+def random_dag(n_tasks, seed):
+    """Случайный DAG с цепочками, ветвлениями и слияниями; номера задач перемешаны"""
+    rng = np.random.default_rng(seed)
+    src, dst = [], []
+    for j in range(1, n_tasks):
+        n_predecessors = int(rng.integers(0, 4)) if rng.random() < 0.5 else 1
+        for i in rng.choice(j, size=min(j, n_predecessors), replace=False):
+            src.append(i)
+            dst.append(j)
+    permutation = rng.permutation(n_tasks)
+    return (permutation[np.array(src, dtype=np.int64)], permutation[np.array(dst, dtype=np.int64)],
+            rng.uniform(0, 10, n_tasks))
+
+
+def reference_cpm(durations, src, dst):
+    """CPM по определению: проходы по топологическому порядку networkx"""
+    graph = nx.DiGraph()
+    graph.add_nodes_from(range(len(durations)))
+    graph.add_edges_from(zip(src.tolist(), dst.tolist()))
+    order = list(nx.topological_sort(graph))
+    early_start = np.zeros(len(durations))
+    for node in order:
+        early_start[node] = max((early_start[p] + durations[p] for p in graph.predecessors(node)), default=0)
+    early_finish = early_start + durations
+    project_duration = early_finish.max(initial=0)
+    late_finish = np.full(len(durations), project_duration)
+    for node in reversed(order):
+        late_finish[node] = min((late_finish[s] - durations[s] for s in graph.successors(node)),
+                                default=project_duration)
+    free_float = np.array([min((early_start[s] for s in graph.successors(node)), default=project_duration)
+                           - early_finish[node] for node in range(len(durations))])
+    return {'ES': early_start, 'EF': early_finish, 'LS': late_finish - durations, 'LF': late_finish,
+            'Float': late_finish - durations - early_start, 'Free_Float': np.maximum(0, free_float)}
+
+
+@pytest.mark.parametrize('seed', range(10))
+def test_compute_cpm_matches_reference(seed):
+    src, dst, durations = random_dag(int(np.random.default_rng(seed).integers(1, 200)), seed)
+    result = main.compute_cpm(durations, src, dst)
+    expected = reference_cpm(durations, src, dst)
+    for column, values in expected.items():
+        np.testing.assert_allclose(result[column], values, atol=1e-9, err_msg=column)
+
+
+def test_long_chain_is_compressed():
+    n_tasks = 5000
+    src, dst = np.arange(n_tasks - 1), np.arange(1, n_tasks)
+    structure = main.prepare_cpm_structure(n_tasks, src, dst)
+    assert structure['n_levels'] == 1
+    result = main.evaluate_cpm(structure, np.ones(n_tasks))
+    np.testing.assert_allclose(result['ES'], np.arange(n_tasks))
+    assert np.allclose(result['Float'], 0)
+
+
+def test_evaluate_cpm_on_sample_matrix_matches_columns():
+    src, dst, _ = random_dag(120, 42)
+    structure = main.prepare_cpm_structure(120, src, dst)
+    durations = np.random.default_rng(1).uniform(1, 5, (120, 6))
+    batch = main.evaluate_cpm(structure, durations)
+    for sample in range(durations.shape[1]):
+        single = main.evaluate_cpm(structure, durations[:, sample])
+        for column, values in single.items():
+            np.testing.assert_allclose(batch[column][:, sample], values, atol=1e-9)
+
+
+def test_cycle_is_rejected():
+    with pytest.raises(ValueError, match="цикл"):
+        main.compute_cpm(np.ones(3), np.array([0, 1, 2]), np.array([1, 2, 0]))
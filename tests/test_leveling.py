@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+
+import main
+
+
+def leveled(tasks, employees, solution, **calendar_kwargs):
+    calendar = main.build_capacity_calendar(employees, **calendar_kwargs)
+    dashboard = main.ProjectGanttDashboard(tasks, employees, calendar=calendar)
+    dashboard.calculate_critical_path()
+    return dashboard, dashboard.level_resources(solution)
+
+
+def test_leveled_schedule_respects_dependencies_and_capacity(project_tasks, project_employees):
+    solution = {('T1', 'E1'): 1, ('T2', 'E1'): 1, ('T3', 'E1'): 1, ('T4', 'E2'): 1, ('T5', 'E3'): 1}
+    dashboard, schedule = leveled(project_tasks, project_employees, solution)
+    schedule = schedule.set_index('task_id')
+
+    for src, dst in zip(*dashboard.dependency_edges):
+        assert schedule.at[dst, 'start_day'] >= schedule.at[src, 'finish_day']
+
+    # Загрузка каждого сотрудника по дням не превышает его емкость в календаре
+    calendar = dashboard.calendar
+    horizon = int(schedule['finish_day'].max())
+    for emp_id in project_employees['emp_id']:
+        load = np.zeros(horizon)
+        for task_id, row in schedule.iterrows():
+            if solution.get((task_id, emp_id)):
+                load[row['start_day']:row['finish_day']] += row['daily_hours']
+        capacity = calendar['daily_hours'][calendar['emp_index'][emp_id], :horizon]
+        assert (load <= capacity + 1e-9).all()
+
+    # T2 и T3 у одного исполнителя не идут параллельно
+    assert (schedule.at['T3', 'start_day'] >= schedule.at['T2', 'finish_day']
+            or schedule.at['T2', 'start_day'] >= schedule.at['T3', 'finish_day'])
+
+
+def test_vacation_over_whole_calendar_does_not_hang(project_tasks):
+    # Отпуск перекрывает весь календарь: после его конца действует номинальная емкость
+    employees = main.pd.DataFrame({'emp_id': ['E1'], 'max_hours_day': [8],
+                                   'vacation_dates': ['2024-01-01:2024-03-31']})
+    solution = {(task_id, 'E1'): 1 for task_id in project_tasks['task_id']}
+    dashboard, schedule = leveled(project_tasks, employees, solution, n_calendar_days=60)
+    assert schedule['start_day'].min() >= len(dashboard.calendar['dates'])
+
+
+def test_serial_sgs_raises_when_task_never_fits():
+    with pytest.raises(ValueError, match="не хватает емкости"):
+        main.serial_schedule_generation(np.array([2]), [(0,)], [], [], [np.array([0])], np.array([4.0]),
+                                        np.zeros((1, 10)))
@@ -0,0 +1,63 @@
+import numpy as np
+
+import main
+from test_cpm import random_dag
+
+
+def estimates(n_tasks, seed=0):
+    rng = np.random.default_rng(seed)
+    optimistic = rng.uniform(1, 3, n_tasks)
+    likely = optimistic + rng.uniform(0, 2, n_tasks)
+    return optimistic, likely, likely + rng.uniform(0, 4, n_tasks)
+
+
+def test_same_seed_gives_identical_samples():
+    src, dst, _ = random_dag(80, 3)
+    structure = main.prepare_cpm_structure(80, src, dst)
+    first = main.simulate_completion_batch(structure, estimates(80), 5000, seed=7)
+    second = main.simulate_completion_batch(structure, estimates(80), 5000, seed=7)
+    np.testing.assert_array_equal(first[0], second[0])
+    np.testing.assert_array_equal(first[1], second[1])
+    other = main.simulate_completion_batch(structure, estimates(80), 5000, seed=8)
+    assert not np.array_equal(first[0], other[0])
+
+
+def test_result_does_not_depend_on_memory_limit_or_criticality():
+    src, dst, _ = random_dag(150, 4)
+    structure = main.prepare_cpm_structure(150, src, dst)
+    small = main.simulate_completion_batch(structure, estimates(150), 5000, seed=11, memory_limit_mb=1)
+    large = main.simulate_completion_batch(structure, estimates(150), 5000, seed=11, memory_limit_mb=512)
+    np.testing.assert_array_equal(small[0], large[0])
+    np.testing.assert_array_equal(small[1], large[1])
+    completion_times, critical_counts = main.simulate_completion_batch(
+        structure, estimates(150), 5000, seed=11, criticality=False)
+    np.testing.assert_array_equal(completion_times, small[0])
+    assert critical_counts is None
+
+
+def test_forward_only_finish_and_criticality_match_full_cpm():
+    n_tasks = 60
+    src, dst, _ = random_dag(n_tasks, 5)
+    structure = main.prepare_cpm_structure(n_tasks, src, dst)
+    n_samples = main.MC_BLOCK_SIZE  # один блок: выборку можно повторить вручную
+    completion_times, critical_counts = main.simulate_completion_batch(
+        structure, estimates(n_tasks), n_samples, seed=3, distribution='triangular')
+
+    rng = np.random.default_rng(main._block_seed(np.random.SeedSequence(3), 0))
+    order = structure['order']
+    durations = np.empty((n_tasks, n_samples))
+    durations[order] = main.sample_task_durations(*(values[order] for values in estimates(n_tasks)),
+                                                  n_samples, rng, 'triangular')
+    cpm = main.evaluate_cpm(structure, durations)
+    np.testing.assert_allclose(completion_times, cpm['EF'].max(axis=0))
+    np.testing.assert_array_equal(critical_counts, (np.abs(cpm['Float']) < 0.001).sum(axis=1))
+
+
+def test_parallel_simulation_matches_serial(project_tasks, project_employees):
+    dashboard = main.ProjectGanttDashboard(project_tasks, project_employees)
+    dashboard.calculate_critical_path()
+    serial = dashboard.simulate_schedule_risk(n_samples=5000, seed=21)
+    parallel = dashboard.simulate_schedule_risk_parallel(n_samples=5000, seed=21, batch_size=2048, max_workers=2)
+    np.testing.assert_array_equal(serial['completion_times'], parallel['completion_times'])
+    np.testing.assert_allclose(serial['criticality_index'], parallel['criticality_index'])
+    assert dashboard.completion_stats('monte_carlo')['samples'] is not None